@@ -19,6 +19,8 @@ class DatabaseConfig(BaseModel):
     """Database configuration"""
     path: str = "data/telegram_client.db"
     enable_wal: bool = True
+    write_batch_window: float = 0.05  # seconds to keep collecting writes while a burst is queued
+    write_batch_size: int = 1024  # max queued writes per commit
 
 class ProxyConfig(BaseModel):
     """Proxy configuration for IP isolation"""
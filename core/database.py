@@ -5,11 +5,20 @@ import asyncio
 import aiosqlite
 from typing import List, Dict, Any, Optional
 from datetime import datetime
+from itertools import groupby
+from operator import itemgetter
 from pathlib import Path
 import json
 from loguru import logger
 from config import config
 
+_SAVE_SESSION_SQL = '''
+    INSERT OR REPLACE INTO sessions
+    (session_name, session_string, session_file_path, phone_number, user_name,
+     device_info, proxy_config, is_active, last_used)
+    VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+'''
+
 class DatabaseManager:
     def __init__(self, db_path: str = None):
         self.db_path = db_path or config.database.path
@@ -17,6 +26,14 @@ class DatabaseManager:
         db_dir = Path(self.db_path).parent
         db_dir.mkdir(parents=True, exist_ok=True)
         self.connection: Optional[aiosqlite.Connection] = None
+        # 写入任务专用连接：批量事务不会与其它协程在共享连接上的 execute/commit 交叉
+        self._writer_connection: Optional[aiosqlite.Connection] = None
+        # 批量写入队列：(sql, params, future)，由单个写入任务统一提交
+        self._write_queue: Optional[asyncio.Queue] = None
+        self._writer_task: Optional[asyncio.Task] = None
+        # 写入修订号：每次提交写入后递增，用于判断 get_all_sessions 的缓存是否过期
+        self._rev = 0
+        self._sessions_cache: Optional[tuple] = None  # (rev, sessions)
 
     async def initialize(self):
         """Initialize database and create tables"""
@@ -35,6 +52,12 @@ class DatabaseManager:
                 await self.connection.execute("PRAGMA busy_timeout=30000")  # 30秒忙等待超时
 
             await self._create_tables()
+
+            self._writer_connection = await aiosqlite.connect(
+                self.db_path,
+                timeout=30.0,
+                isolation_level=None
+            )
             logger.info(f"Database initialized at {self.db_path}")
 
         except Exception as e:
@@ -173,15 +196,11 @@ class DatabaseManager:
             device_json = json.dumps(device_info) if device_info else None
             proxy_json = json.dumps(proxy_config) if proxy_config else None
 
-            await self.connection.execute('''
-                INSERT OR REPLACE INTO sessions
-                (session_name, session_string, session_file_path, phone_number, user_name,
-                 device_info, proxy_config, is_active, last_used)
-                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
-            ''', (session_name, session_string, session_file_path, phone_number, user_name,
+            await self.connection.execute(_SAVE_SESSION_SQL, (session_name, session_string, session_file_path, phone_number, user_name,
                   device_json, proxy_json, is_active, datetime.now()))
 
             await self.connection.commit()
+            self._rev += 1
             logger.info(f"Session {session_name} saved to database")
             return True
 
@@ -189,6 +208,31 @@ class DatabaseManager:
             logger.error(f"Failed to save session {session_name}: {e}")
             return False
 
+    async def save_sessions_bulk(self, sessions: List[Dict[str, Any]]) -> bool:
+        """Save many sessions at once; the writer task commits them in one transaction"""
+        if not sessions:
+            return True
+
+        now = datetime.now()
+        rows = [
+            (s['session_name'], s.get('session_string'), s.get('session_file_path'),
+             s.get('phone_number'), s.get('user_name'),
+             json.dumps(s['device_info']) if s.get('device_info') else None,
+             json.dumps(s['proxy_config']) if s.get('proxy_config') else None,
+             s.get('is_active'), now)
+            for s in sessions
+        ]
+
+        try:
+            # 所有行同时入队，写入任务会用一次 executemany 在同一事务内提交
+            await asyncio.gather(*(self.submit_write(_SAVE_SESSION_SQL, row) for row in rows))
+            logger.info(f"{len(rows)} sessions saved to database")
+            return True
+
+        except Exception as e:
+            logger.error(f"Failed to save {len(rows)} sessions: {e}")
+            return False
+
     async def load_session(self, session_name: str) -> Optional[Dict[str, Any]]:
         """Load session information"""
         try:
@@ -278,6 +322,24 @@ class DatabaseManager:
 
             return []
 
+    async def get_all_sessions_cached(self, client_rev: Optional[int] = None):
+        """Return (rev, sessions); sessions is None when client_rev is still current"""
+        rev = self._rev
+        if client_rev == rev:
+            return rev, None
+        if self._sessions_cache and self._sessions_cache[0] == rev:
+            return rev, self._sessions_cache[1]
+
+        sessions = await self.get_all_sessions()
+        # 查询期间有新的写入时不缓存，下次调用重新查询
+        if self._rev == rev:
+            self._sessions_cache = (rev, sessions)
+        return rev, sessions
+
+    def invalidate_sessions_cache(self):
+        """直接通过 connection 写入 sessions 表后调用"""
+        self._rev += 1
+
     async def save_message(self, session_name: str, message_data: Dict[str, Any]) -> bool:
         """Save message to database"""
         try:
@@ -415,6 +477,19 @@ class DatabaseManager:
             logger.error(f"Failed to add group session: {e}")
             return False
 
+    async def add_group_sessions(self, group_id: int, session_names: List[str]) -> bool:
+        """Add multiple sessions to a group in one transaction"""
+        try:
+            await self.connection.executemany('''
+                INSERT OR IGNORE INTO group_sessions (group_id, session_name)
+                VALUES (?, ?)
+            ''', [(group_id, name) for name in session_names])
+            await self.connection.commit()
+            return True
+        except Exception as e:
+            logger.error(f"Failed to add group sessions: {e}")
+            return False
+
     async def remove_group_session(self, group_id: int, session_name: str) -> bool:
         """Remove a session from a group"""
         try:
@@ -439,6 +514,22 @@ class DatabaseManager:
             logger.error(f"Failed to get group sessions: {e}")
             return []
 
+    async def get_group_sessions_with_details(self, group_id: int) -> List[Dict[str, Any]]:
+        """Get the full session rows of a group's members in one query"""
+        try:
+            cursor = await self.connection.execute('''
+                SELECT s.* FROM sessions s
+                JOIN group_sessions gs ON gs.session_name = s.session_name
+                WHERE gs.group_id = ?
+                ORDER BY gs.session_name
+            ''', (group_id,))
+            rows = await cursor.fetchall()
+            columns = [desc[0] for desc in cursor.description]
+            return [dict(zip(columns, row)) for row in rows]
+        except Exception as e:
+            logger.error(f"Failed to get group session details: {e}")
+            return []
+
     async def get_session_groups(self, session_name: str) -> List[int]:
         """Get all groups for a session"""
         try:
@@ -742,6 +833,7 @@ class DatabaseManager:
                     cursor = await self.connection.execute(query)
 
                 await self.connection.commit()
+                self._rev += 1
                 return cursor
             except Exception as e:
                 error_msg = str(e).lower()
@@ -754,8 +846,81 @@ class DatabaseManager:
                 # 如果不是锁定错误或重试次数用完，抛出异常
                 raise e
 
+    def _ensure_writer(self):
+        """Start the batched writer task on the running loop if needed"""
+        if self._writer_task is None or self._writer_task.done():
+            self._write_queue = asyncio.Queue()
+            self._writer_task = asyncio.get_running_loop().create_task(self._writer_loop())
+
+    async def submit_write(self, query: str, parameters=()) -> bool:
+        """Queue a write for the writer task and wait until it is committed"""
+        self._ensure_writer()
+        future = asyncio.get_running_loop().create_future()
+        await self._write_queue.put((query, parameters, future))
+        return await future
+
+    async def _writer_loop(self):
+        """Drain queued writes, committing each batch window in one transaction"""
+        loop = asyncio.get_running_loop()
+        window = config.database.write_batch_window
+        max_size = config.database.write_batch_size
+
+        while True:
+            batch = [await self._write_queue.get()]
+            while len(batch) < max_size and not self._write_queue.empty():
+                batch.append(self._write_queue.get_nowait())
+            # 只有一条写入时立即提交；有积压说明正处于写入高峰，再在批处理窗口内继续收集
+            deadline = loop.time() + window
+            while 1 < len(batch) < max_size:
+                remaining = deadline - loop.time()
+                if remaining <= 0:
+                    break
+                try:
+                    batch.append(await asyncio.wait_for(self._write_queue.get(), remaining))
+                except asyncio.TimeoutError:
+                    break
+
+            conn = self._writer_connection
+            try:
+                await conn.execute("BEGIN")
+                # 相邻的相同语句合并为一次 executemany
+                for query, items in groupby(batch, key=itemgetter(0)):
+                    await conn.executemany(query, [item[1] for item in items])
+                await conn.commit()
+                self._rev += 1
+                for _, _, future in batch:
+                    if not future.done():
+                        future.set_result(True)
+            except Exception as e:
+                logger.error(f"Batched write failed ({len(batch)} statements): {e}")
+                try:
+                    await conn.rollback()
+                except Exception:
+                    pass
+                for _, _, future in batch:
+                    if not future.done():
+                        future.set_exception(e)
+            finally:
+                for _ in batch:
+                    self._write_queue.task_done()
+
     async def close(self):
         """Close database connection"""
+        if self._writer_task and not self._writer_task.done():
+            try:
+                await self._write_queue.join()
+            finally:
+                self._writer_task.cancel()
+            self._writer_task = None
+
+        if self._writer_connection:
+            try:
+                await self._writer_connection.close()
+            except Exception as e:
+                logger.error(f"Error closing writer connection: {e}")
+            finally:
+                self._writer_connection = None
+
         if self.connection:
             try:
                 # 确保所有事务都被提交
@@ -0,0 +1,74 @@
+"""
+Connected clients kept after a session file scan so the import can reuse them
+"""
+import asyncio
+from typing import Callable, Dict, Optional, Tuple
+from loguru import logger
+from telethon import TelegramClient
+
+class ScanClientPool:
+    """Clients that passed validation, keyed by the resolved session file path
+
+    Each client may carry an on_closed callback that runs once the client has
+    disconnected, i.e. after Telethon's last write to the session file.
+    """
+
+    def __init__(self):
+        self._clients: Dict[str, Tuple[TelegramClient, Optional[Callable[[], None]]]] = {}
+
+    def __bool__(self):
+        return bool(self._clients)
+
+    def get(self, key: str) -> Optional[TelegramClient]:
+        """Return the kept client if it is still connected, without taking it"""
+        entry = self._clients.get(key)
+        if entry is not None and entry[0].is_connected():
+            return entry[0]
+        return None
+
+    async def keep(self, key: str, client: TelegramClient,
+                   on_closed: Optional[Callable[[], None]] = None):
+        """Keep a connected client, closing the one it replaces"""
+        old = self._clients.pop(key, None)
+        self._clients[key] = (client, on_closed)
+        if old is not None and old[0] is not client:
+            await self._close(old[0])
+
+    async def take(self, key: str) -> Tuple[Optional[TelegramClient], Optional[Callable[[], None]]]:
+        """Remove a kept entry and return (client, on_closed)
+
+        A client whose connection has dropped is closed and returned as None.
+        The caller runs on_closed after disconnecting whichever client it ends up using.
+        """
+        entry = self._clients.pop(key, None)
+        if entry is None:
+            return None, None
+        client, on_closed = entry
+        if client.is_connected():
+            return client, on_closed
+        # 连接已断开的客户端仍持有 session 文件的 SQLite 句柄，必须关闭后才能重新打开
+        await self._close(client)
+        return None, on_closed
+
+    async def close_all(self):
+        """Disconnect every kept client"""
+        entries = list(self._clients.values())
+        self._clients.clear()
+        await asyncio.gather(*(self._close(client, on_closed) for client, on_closed in entries))
+
+    @staticmethod
+    async def _close(client: TelegramClient, on_closed: Optional[Callable[[], None]] = None):
+        try:
+            await client.disconnect()
+        except Exception as e:
+            logger.debug(f"Failed to disconnect scan client: {e}")
+            return
+        if on_closed is not None:
+            on_closed()
+
+# Global scan client pool instance
+scan_clients = ScanClientPool()
+
+async def disconnect_scan_clients():
+    """Disconnect clients kept by the scan that the import did not use"""
+    await scan_clients.close_all()
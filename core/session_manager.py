@@ -339,6 +339,7 @@ class SessionManager:
                 DELETE FROM sessions WHERE session_name = ?
             ''', (session_name,))
             await db_manager.connection.commit()
+            db_manager.invalidate_sessions_cache()
 
             # Remove session files
             session_file = self.session_dir / f"{session_name}.session"
@@ -378,6 +379,7 @@ class SessionManager:
                 UPDATE sessions SET session_string = ? WHERE session_name = ?
             ''', (session_string, session_name))
             await db_manager.connection.commit()
+            db_manager.invalidate_sessions_cache()
 
             if session_name not in self.active_sessions:
                 await client.disconnect()
@@ -1,8 +1,12 @@
 """
 Telegram client wrapper with integrated session and message management using Telethon
+
+Performance notes: install `cryptg` (see requirements.txt) so Telethon uses its
+native AES implementation for send_file/get_dialogs traffic.
 """
 import asyncio
-from typing import Dict, List, Optional, Any, Callable
+from operator import attrgetter
+from typing import Dict, List, Optional, Any, Callable, Tuple
 from loguru import logger
 from telethon import TelegramClient
 from telethon.tl.types import User, Chat
@@ -11,12 +15,40 @@ from core.session_manager import session_manager
 from core.message_handler import message_manager
 from core.database import db_manager
 
+# 对话实体属性的批量读取器，每个实体只做一次属性查找
+_GROUP_FIELDS = ('username', 'title')
+_get_group_fields = attrgetter(*_GROUP_FIELDS)
+
+def _read_fields(entity, names, getter):
+    """Read several entity attributes at once, missing ones become None"""
+    try:
+        return getter(entity)
+    except AttributeError:
+        # 例如普通 Chat 没有 username 字段
+        return tuple(getattr(entity, name, None) for name in names)
+
 class TelegramClientManager:
     """Unified Telegram client manager using Telethon"""
 
     def __init__(self):
         self.clients: Dict[str, TelegramClient] = {}
         self.message_callbacks: Dict[str, List[Callable]] = {}
+        # clients 键的只读快照，随增删同步更新，供高频读取直接使用
+        self._active_tuple: Tuple[str, ...] = ()
+        # 断线回调发起的会话清理任务，保留引用直到完成
+        self._pending_teardowns: set = set()
+
+    def _register_client(self, session_name: str, client: TelegramClient):
+        """Store a client and refresh the active session snapshot"""
+        self.clients[session_name] = client
+        self._active_tuple = tuple(self.clients)
+
+    def forget_client(self, session_name: str) -> bool:
+        """Remove a client and refresh the active session snapshot"""
+        if self.clients.pop(session_name, None) is None:
+            return False
+        self._active_tuple = tuple(self.clients)
+        return True
 
     async def initialize(self):
         """Initialize the client manager"""
@@ -29,7 +61,7 @@ class TelegramClientManager:
             try:
                 client = await session_manager.load_session(session_name)
                 if client:
-                    self.clients[session_name] = client
+                    self._register_client(session_name, client)
                     logger.info(f"Loaded existing session: {session_name}")
             except Exception as e:
                 logger.error(f"Failed to load session {session_name}: {e}")
@@ -52,7 +84,7 @@ class TelegramClientManager:
                 )
                 if client:
                     session_name = session_name or client.name
-                    self.clients[session_name] = client
+                    self._register_client(session_name, client)
 
             if session_name:
                 logger.info(f"Session created: {session_name}")
@@ -69,7 +101,7 @@ class TelegramClientManager:
             if session_name:
                 client = await session_manager.load_session(session_name)
                 if client:
-                    self.clients[session_name] = client
+                    self._register_client(session_name, client)
                     logger.info(f"Session imported: {session_name}")
             return session_name
 
@@ -84,7 +116,11 @@ class TelegramClientManager:
             if success:
                 client = session_manager.active_sessions.get(session_name)
                 if client:
-                    self.clients[session_name] = client
+                    self._register_client(session_name, client)
+                    # 连接断开时立即失效，而不是等待下一次状态轮询
+                    client.disconnected.add_done_callback(
+                        lambda _, name=session_name, c=client: self._invalidate(name, c)
+                    )
                     # 启动消息监听
                     await message_manager.start_listening(session_name)
 
@@ -99,6 +135,25 @@ class TelegramClientManager:
             logger.error(f"Failed to start session {session_name}: {e}")
             return False
 
+    def _invalidate(self, session_name: str, client: TelegramClient):
+        """Tear down a session whose connection has gone away"""
+        # 已被 stop_session 主动移除或已替换为新客户端时无需处理
+        if self.clients.get(session_name) is not client:
+            return
+
+        logger.warning(f"Session disconnected: {session_name}")
+        # 客户端保持注册直到 stop_session 完成，关闭时的清理仍能覆盖该会话
+        task = asyncio.ensure_future(self._teardown(session_name, client))
+        self._pending_teardowns.add(task)
+        task.add_done_callback(self._pending_teardowns.discard)
+
+    async def _teardown(self, session_name: str, client: TelegramClient):
+        """Stop a dropped session through the session manager"""
+        if self.clients.get(session_name) is not client:
+            return
+        if not await self.stop_session(session_name):
+            logger.error(f"Failed to tear down disconnected session: {session_name}")
+
     async def sync_dialogs(self, session_name: str):
         """【核心逻辑】拉取账号的所有群组并保存"""
         client = self.clients.get(session_name)
@@ -109,44 +164,31 @@ class TelegramClientManager:
             dialogs = await client.get_dialogs(limit=config.telegram.dialogs_limit)  # 使用配置限制
 
             for d in dialogs:
+                # 我们主要关注群组和频道，私聊对话直接跳过，不再构造标题
+                if not (d.is_group or d.is_channel):
+                    continue
+
                 chat = d.entity
                 chat_id = chat.id
-                username = getattr(chat, 'username', None)
+                chat_type = 'channel' if d.is_channel else 'group'
 
                 # 【修正1】更健壮地获取聊天标题
-                chat_title = None
-                chat_type = None
-
-                if d.is_group or d.is_channel:
-                    chat_title = getattr(chat, 'title', None)
-                    chat_type = 'channel' if d.is_channel else 'group'
-                elif d.is_user:
-                    # 对于用户，使用他们的名字作为标题，并标记为 'user' 类型
-                    chat_title = getattr(chat, 'first_name', None)
-                    if getattr(chat, 'last_name', None):
-                        chat_title += f" {chat.last_name}"
-                    chat_type = 'user'
+                username, chat_title = _read_fields(chat, _GROUP_FIELDS, _get_group_fields)
 
                 # 【修正2】确保 chat_title 不为 None，提供一个默认值
-                if not chat_title:
-                    if username:
-                        chat_title = f"@{username}"
-                    else:
-                        chat_title = f"未知对话 {chat_id}"
-
-                # 我们主要关注群组和频道，所以只保存这些类型
-                if chat_type in ['group', 'channel']:
-                    chat_data = {
-                        'chat_id': chat_id,
-                        'title': chat_title,  # 使用处理后的标题
-                        'type': chat_type,
-                        'username': username,
-                        'last_message_time': d.message.date if d.message else None  # 确保获取最后消息时间
-                    }
-                    await db_manager.save_chat(session_name, chat_data)
-
-                    # 自动建立 账号<->群组 的关联
-                    await db_manager.add_group_session(chat_id, session_name)
+                chat_title = chat_title or (f"@{username}" if username else f"未知对话 {chat_id}")
+
+                chat_data = {
+                    'chat_id': chat_id,
+                    'title': chat_title,  # 使用处理后的标题
+                    'type': chat_type,
+                    'username': username,
+                    'last_message_time': d.message.date if d.message else None  # 确保获取最后消息时间
+                }
+                await db_manager.save_chat(session_name, chat_data)
+
+                # 自动建立 账号<->群组 的关联
+                await db_manager.add_group_session(chat_id, session_name)
 
             logger.info(f"会话 {session_name} 群组同步完成")
         except Exception as e:
@@ -155,10 +197,15 @@ class TelegramClientManager:
     async def stop_session(self, session_name: str) -> bool:
         """Stop a session"""
         try:
+            # 先移除客户端，主动断开触发的 disconnected 回调不会被当作意外断线处理
+            client = self.clients.get(session_name)
+            forgotten = self.forget_client(session_name)
             success = await session_manager.stop_session(session_name)
-            if success and session_name in self.clients:
-                del self.clients[session_name]
-                logger.info(f"Session stopped: {session_name}")
+            if success:
+                if forgotten:
+                    logger.info(f"Session stopped: {session_name}")
+            elif forgotten:
+                self._register_client(session_name, client)
             return success
 
         except Exception as e:
@@ -174,8 +221,8 @@ class TelegramClientManager:
             # Delete from manager
             success = await session_manager.delete_session(session_name)
 
-            if success and session_name in self.clients:
-                del self.clients[session_name]
+            if success:
+                self.forget_client(session_name)
 
             return success
 
@@ -325,7 +372,7 @@ class TelegramClientManager:
 
     def get_active_sessions(self) -> List[str]:
         """Get active session names"""
-        return list(self.clients.keys())
+        return list(self._active_tuple)
 
     async def get_all_sessions(self) -> List[Dict[str, Any]]:
         """Get all sessions info"""
@@ -339,6 +386,7 @@ class TelegramClientManager:
         """Refresh status of all sessions"""
         try:
             sessions = await self.get_all_sessions()
+            writes = []
             for session_data in sessions:
                 session_name = session_data['session_name']
                 is_active = session_data.get('is_active', False)
@@ -347,16 +395,18 @@ class TelegramClientManager:
                 if client and client.is_connected:
                     if not is_active:
                         # Update database
-                        await db_manager.connection.execute('''
+                        writes.append(db_manager.submit_write('''
                             UPDATE sessions SET is_active = 1 WHERE session_name = ?
-                        ''', (session_name,))
-                        await db_manager.connection.commit()
+                        ''', (session_name,)))
                 elif is_active:
                     # Update database
-                    await db_manager.connection.execute('''
+                    writes.append(db_manager.submit_write('''
                         UPDATE sessions SET is_active = 0 WHERE session_name = ?
-                    ''', (session_name,))
-                    await db_manager.connection.commit()
+                    ''', (session_name,)))
+
+            # 交给写入任务合并为同一批次提交
+            if writes:
+                await asyncio.gather(*writes)
 
         except Exception as e:
             logger.error(f"Failed to refresh session status: {e}")
@@ -371,7 +421,6 @@ async def init_telegram_client():
 
 async def cleanup_telegram_client():
     """Cleanup Telegram client manager"""
-    active_sessions = telegram_client.get_active_sessions()
-    for session_name in active_sessions:
+    for session_name in telegram_client.get_active_sessions():
         await telegram_client.stop_session(session_name)
     logger.info("Telegram client manager cleaned up")
@@ -4,12 +4,13 @@ Quick start script for Telegram Desktop Client
 """
 import os
 import sys
+from importlib.util import find_spec
 from pathlib import Path
 
 def check_env_file():
     """Check if .env file exists and has required configuration"""
     env_file = Path(".env")
-    if not env_file.exists():
+    if not env_file.is_file():
         print("❌ .env file not found!")
         print("Please create a .env file with your Telegram API credentials:")
         print("TELEGRAM_API_ID=your_api_id")
@@ -17,14 +18,13 @@ def check_env_file():
         print("\nGet these from: https://my.telegram.org/")
         return False
 
-    # Read env file
-    with open(env_file, 'r') as f:
-        content = f.read()
-
-    if 'your_api_id_here' in content or 'your_api_hash_here' in content:
-        print("❌ Please configure your .env file with actual API credentials!")
-        print("Current .env file contains placeholder values.")
-        return False
+    # Scan env file line by line, stopping at the first placeholder
+    with open(env_file, 'rb') as f:
+        for line in f:
+            if b'your_api_id_here' in line or b'your_api_hash_here' in line:
+                print("❌ Please configure your .env file with actual API credentials!")
+                print("Current .env file contains placeholder values.")
+                return False
 
     print("✅ .env file configured")
     return True
@@ -43,12 +43,8 @@ def check_dependencies():
         'python-dotenv': 'dotenv'
     }
 
-    missing = []
-    for package, module in required_modules.items():
-        try:
-            __import__(module)
-        except ImportError:
-            missing.append(package)
+    # Only look up the module spec; importing would execute each package's top-level code
+    missing = [package for package, module in required_modules.items() if find_spec(module) is None]
 
     if missing:
         print(f"❌ Missing dependencies: {', '.join(missing)}")
@@ -76,11 +72,19 @@ def main():
 
     # Import and run main application
     try:
-        # 直接运行 main.py 模块（它会在 if __name__ == "__main__" 块中启动）
-        import subprocess
-        import sys
-        result = subprocess.run([sys.executable, "main.py"], cwd=".")
-        return result.returncode
+        if '--subprocess' in sys.argv:
+            # 兼容旧方式：在独立的解释器中运行 main.py
+            import subprocess
+            result = subprocess.run([sys.executable, "main.py"], cwd=".")
+            return result.returncode
+
+        # 在当前进程中启动，省去再启动一个解释器
+        from main import start_application
+        start_application()
+        return 0
+    except SystemExit as e:
+        # start_application() 可能会调用 sys.exit()
+        return e.code
     except KeyboardInterrupt:
         print("\n👋 Application interrupted by user")
         return 0
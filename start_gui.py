@@ -5,10 +5,14 @@ GUI启动脚本 - 专门处理macOS显示问题
 import os
 import sys
 import platform
+from typing import Final
+
+# 平台信息在导入时确定一次
+_IS_DARWIN: Final[bool] = platform.system() == "Darwin"
 
 def setup_macos_display():
     """设置macOS显示环境"""
-    if platform.system() == "Darwin":
+    if _IS_DARWIN:
         # 检查是否已经有DISPLAY设置
         if not os.environ.get('DISPLAY'):
             print("检测到macOS环境，设置DISPLAY=:0")
@@ -26,24 +30,7 @@ def main():
     # 设置macOS显示环境
     setup_macos_display()
 
-    # 检查是否在图形环境中
-    try:
-        from PyQt6.QtWidgets import QApplication
-        app = QApplication.instance()
-        if app is None:
-            app = QApplication(sys.argv)
-
-        screen = app.primaryScreen()
-        if screen:
-            print(f"✅ 检测到图形环境 - 屏幕大小: {screen.size().width()}x{screen.size().height()}")
-        else:
-            print("⚠️ 未检测到屏幕，可能无法显示GUI")
-            return 1
-    except Exception as e:
-        print(f"❌ PyQt6初始化失败: {e}")
-        return 1
-
-    # 导入并运行主程序
+    # 导入并运行主程序（屏幕检测由 start_application 在创建 QApplication 时完成）
     try:
         print("正在启动主程序...")
         from main import start_application
@@ -1,43 +1,67 @@
 # ui/main_window.py
 
-import sys
 import platform
+import importlib
+import threading
 from PyQt6.QtWidgets import (QMainWindow, QWidget, QVBoxLayout, QHBoxLayout,
-                             QStackedWidget, QLabel, QPushButton, QButtonGroup)
+                             QStackedWidget, QLabel, QPushButton, QButtonGroup,
+                             QApplication)
 from PyQt6.QtCore import Qt, QEvent
 from PyQt6.QtGui import QCloseEvent
+from loguru import logger
 
 from ui.styles import get_stylesheet
 
-# Import your pages
-from ui.pages.accounts_page import AccountsPage
-from ui.pages.groups_page import GroupsPage
-from ui.pages.script_page import ScriptPage
+# 平台信息在导入时确定一次
+_IS_DARWIN = platform.system() == "Darwin"
+
+# 页面模块按需导入：索引 -> (模块, 类名)，与导航按钮 id 一致；
+# PyInstaller 无法追踪动态导入，新增页面时需在 .github/workflows/build.yml 中加入 --hidden-import
+_PAGE_IMPORTS = {
+    0: ("ui.pages.accounts_page", "AccountsPage"),
+    1: ("ui.pages.groups_page", "GroupsPage"),
+    2: ("ui.pages.script_page", "ScriptPage"),
+}
+
+def _bg_preload():
+    """在后台线程中预先导入页面模块"""
+    for module, _ in _PAGE_IMPORTS.values():
+        try:
+            importlib.import_module(module)
+        except Exception as e:
+            # 真正创建页面时会在主线程再次导入并抛出异常
+            logger.warning(f"预加载页面模块失败 {module}: {e}")
+
+def preload_pages():
+    """在后台守护线程中开始导入页面模块"""
+    threading.Thread(target=_bg_preload, name="page-preload", daemon=True).start()
 
 class MainWindow(QMainWindow):
     """现代化主窗口 - 左侧边栏 + 内容区域"""
 
+    # 各页面实例对应的属性名（其它模块通过 page_accounts 等访问页面）
+    _PAGE_ATTRS = ("page_accounts", "page_groups", "page_scripts")
+
+    # 导航按钮：(文字, 页面索引, 属性名)
+    _NAV = (
+        ("👥 账号管理", 0, "btn_accounts"),
+        ("💬 群组管理", 1, "btn_groups"),
+        ("🎭 剧本执行", 2, "btn_scripts"),
+    )
+
     def __init__(self):
         super().__init__()
-        print("MainWindow: 开始初始化")
+        logger.debug("MainWindow: 开始初始化")
 
         self.setWindowTitle("Telegram 群组管理器 v2.0")
         self.resize(1200, 800)
-        print("MainWindow: 基本属性设置完成")
+        logger.debug("MainWindow: 基本属性设置完成")
 
         # macOS 特殊处理
-        if platform.system() == "Darwin":  # macOS
+        if _IS_DARWIN:  # macOS
             # 简化macOS窗口设置，避免样式问题
             self.setAttribute(Qt.WidgetAttribute.WA_MacShowFocusRect, False)
-            print("MainWindow: macOS特殊处理完成")
-
-        # 应用现代化的样式表
-        try:
-            self.setStyleSheet(get_stylesheet())
-            print("MainWindow: 样式表应用完成")
-        except Exception as e:
-            print(f"MainWindow: 样式表应用失败: {e}")
-            # 不应用样式表，继续运行
+            logger.debug("MainWindow: macOS特殊处理完成")
 
         # 主布局容器
         self.central_widget = QWidget()
@@ -45,55 +69,61 @@ class MainWindow(QMainWindow):
         self.main_layout = QHBoxLayout(self.central_widget)
         self.main_layout.setContentsMargins(0, 0, 0, 0)
         self.main_layout.setSpacing(0)
-        print("MainWindow: 主布局容器创建完成")
+        logger.debug("MainWindow: 主布局容器创建完成")
 
         # 1. 初始化侧边栏
         try:
             self.init_sidebar()
-            print("MainWindow: 侧边栏初始化完成")
+            logger.debug("MainWindow: 侧边栏初始化完成")
         except Exception as e:
-            print(f"MainWindow: 侧边栏初始化失败: {e}")
+            logger.exception(f"MainWindow: 侧边栏初始化失败: {e}")
             raise
 
         # 2. 初始化内容区域
         try:
             self.init_content_area()
-            print("MainWindow: 内容区域初始化完成")
+            logger.debug("MainWindow: 内容区域初始化完成")
         except Exception as e:
-            print(f"MainWindow: 内容区域初始化失败: {e}")
+            logger.exception(f"MainWindow: 内容区域初始化失败: {e}")
             raise
 
         # 3. 连接侧边栏到内容
         try:
             self.setup_connections()
-            print("MainWindow: 连接设置完成")
+            logger.debug("MainWindow: 连接设置完成")
         except Exception as e:
-            print(f"MainWindow: 连接设置失败: {e}")
+            logger.exception(f"MainWindow: 连接设置失败: {e}")
             raise
 
         # 默认显示第一个页面
         try:
-            self.nav_group.button(0).setChecked(True)
+            self.btn_accounts.setChecked(True)
             self.stack.setCurrentIndex(0)
-            print("MainWindow: 默认页面设置完成")
+            logger.debug("MainWindow: 默认页面设置完成")
         except Exception as e:
-            print(f"MainWindow: 默认页面设置失败: {e}")
+            logger.exception(f"MainWindow: 默认页面设置失败: {e}")
             raise
 
-        # macOS 额外处理 - 在窗口初始化完成后再次确保属性正确
-        if platform.system() == "Darwin":
-            # 使用定时器延迟设置，确保窗口完全初始化后再设置属性
-            from PyQt6.QtCore import QTimer
-            QTimer.singleShot(100, self._ensure_macos_window_attributes)
-            print("MainWindow: macOS额外处理设置完成")
+        # 应用现代化的样式表：所有子控件创建完成后再设置，统一做一次样式 polish；
+        # 设置在 QApplication 上，解析结果可被之后的窗口复用
+        try:
+            app = QApplication.instance()
+            if not app.styleSheet():
+                app.setStyleSheet(get_stylesheet())
+            logger.debug("MainWindow: 样式表应用完成")
+        except Exception as e:
+            logger.warning(f"MainWindow: 样式表应用失败: {e}")
+            # 不应用样式表，继续运行
 
-        print("MainWindow: 初始化完成")
+        logger.debug("MainWindow: 初始化完成")
 
     def init_sidebar(self):
         """创建左侧导航栏"""
         self.sidebar = QWidget()
         self.sidebar.setObjectName("Sidebar")
         self.sidebar.setFixedWidth(260)
+        # 构建期间暂停重绘，全部控件添加完后统一计算一次布局
+        self.sidebar.setUpdatesEnabled(False)
 
         layout = QVBoxLayout(self.sidebar)
         layout.setContentsMargins(0, 25, 0, 25)
@@ -112,13 +142,10 @@ class MainWindow(QMainWindow):
         self.nav_group.setExclusive(True)
 
         # 创建导航按钮
-        self.btn_accounts = self.create_nav_btn("👥 账号管理", 0)
-        self.btn_groups = self.create_nav_btn("💬 群组管理", 1)
-        self.btn_scripts = self.create_nav_btn("🎭 剧本执行", 2)
-
-        layout.addWidget(self.btn_accounts)
-        layout.addWidget(self.btn_groups)
-        layout.addWidget(self.btn_scripts)
+        for text, idx, attr in self._NAV:
+            btn = self.create_nav_btn(text, idx)
+            setattr(self, attr, btn)
+            layout.addWidget(btn)
 
         layout.addStretch()
 
@@ -128,6 +155,8 @@ class MainWindow(QMainWindow):
         layout.addWidget(version)
 
         self.main_layout.addWidget(self.sidebar)
+        self.sidebar.setUpdatesEnabled(True)
+        layout.activate()
 
     def create_nav_btn(self, text, id):
         """创建导航按钮"""
@@ -145,81 +174,65 @@ class MainWindow(QMainWindow):
         layout.setContentsMargins(25, 25, 25, 25)
 
         self.stack = QStackedWidget()
+        # 页面在显示前不分配原生窗口句柄
+        self.stack.setAttribute(Qt.WidgetAttribute.WA_DontCreateNativeAncestors, True)
 
-        # 实例化页面
-        self.page_accounts = AccountsPage()
-        self.page_groups = GroupsPage()
-        self.page_scripts = ScriptPage()
-
-        self.stack.addWidget(self.page_accounts)
-        self.stack.addWidget(self.page_groups)
-        self.stack.addWidget(self.page_scripts)
+        # 页面按需实例化：启动时只创建首页，其余页面先放占位控件，首次切换时再创建
+        self._pages = {}
+        for _ in _PAGE_IMPORTS:
+            placeholder = QWidget()
+            placeholder.setAttribute(Qt.WidgetAttribute.WA_DontCreateNativeAncestors, True)
+            self.stack.addWidget(placeholder)
+        self._materialize(0)
 
         layout.addWidget(self.stack)
         self.main_layout.addWidget(self.content_container)
 
     def setup_connections(self):
         """连接侧边栏到内容切换"""
-        self.nav_group.idClicked.connect(self.stack.setCurrentIndex)
+        # 尚未创建的页面先由 _lazy_show 实例化，之后由 C++ 槽 setCurrentIndex 直接切换
+        if len(self._pages) < len(_PAGE_IMPORTS):
+            self.nav_group.idClicked.connect(self._lazy_show)
+        self.nav_group.idClicked.connect(self.stack.setCurrentIndex, Qt.ConnectionType.DirectConnection)
+
+    def _materialize(self, idx):
+        """创建页面并替换该位置的占位控件"""
+        module, cls = _PAGE_IMPORTS[idx]
+        page = getattr(importlib.import_module(module), cls)()
+        page.setAttribute(Qt.WidgetAttribute.WA_DontCreateNativeAncestors, True)
+        placeholder = self.stack.widget(idx)
+        self.stack.insertWidget(idx, page)
+        self.stack.removeWidget(placeholder)
+        placeholder.deleteLater()
+
+        self._pages[idx] = page
+        setattr(self, self._PAGE_ATTRS[idx], page)
+        return page
+
+    def _lazy_show(self, idx):
+        """首次访问时创建页面；所有页面都创建后断开此槽"""
+        if idx not in self._pages:
+            self._materialize(idx)
+        if len(self._pages) == len(_PAGE_IMPORTS):
+            self.nav_group.idClicked.disconnect(self._lazy_show)
 
     def closeEvent(self, event: QCloseEvent):
         """程序关闭事件处理"""
         # 清理资源
         try:
-            # 首先停止脚本执行
-            if hasattr(self, 'page_scripts'):
-                self.page_scripts.stop_script_execution()
-
-            # 停止账号页面的工作线程
-            if hasattr(self, 'page_accounts'):
-                self.page_accounts.cleanup_threads()
+            # 停止脚本执行和各页面的工作线程；从未打开过的页面无需清理
+            for page in self._pages.values():
+                if hasattr(page, "stop_script_execution"):
+                    page.stop_script_execution()
+                if hasattr(page, "cleanup_threads"):
+                    page.cleanup_threads()
 
-            # 简单地标记应用程序即将退出，让main.py处理异步清理
-            import sys
-            sys.exit(0)
+            # 让Qt事件循环正常返回，由main.py处理异步清理
+            event.accept()
+            QApplication.instance().quit()
 
         except Exception as e:
-            print(f"清理资源时出错: {e}")
+            logger.exception(f"清理资源时出错: {e}")
             # 即使清理出错也要退出
-            import sys
-            sys.exit(1)
-
-    def _macos_window_fix(self):
-        """macOS窗口控制按钮修复"""
-        if platform.system() == "Darwin":
-            try:
-                # 临时隐藏再显示来强制macOS重新绘制窗口控制按钮
-                self.hide()
-                from PyQt6.QtCore import QTimer
-                QTimer.singleShot(10, self.show)
-            except Exception as e:
-                print(f"macOS窗口修复失败: {e}")
-
-    def _ensure_macos_window_attributes(self):
-        """确保macOS上的窗口属性正确设置"""
-        if platform.system() == "Darwin":
-            # 重新设置窗口标志，确保控制按钮可用
-            current_flags = self.windowFlags()
-            new_flags = (Qt.WindowType.Window |
-                        Qt.WindowType.WindowMinimizeButtonHint |
-                        Qt.WindowType.WindowMaximizeButtonHint |
-                        Qt.WindowType.WindowCloseButtonHint)
-
-            if current_flags != new_flags:
-                self.setWindowFlags(new_flags)
-                self.show()  # 重新显示窗口以应用新标志
-
-            # 重新激活窗口
-            self.activateWindow()
-            self.raise_()
-            self.setFocus()
-
-            # 再次设置模态属性
-            self.setWindowModality(Qt.WindowModality.NonModal)
-
-            # 强制刷新窗口
-            self.repaint()
-
-            # 对于macOS，尝试通过最小化/恢复来强制重绘窗口控制按钮
-            from PyQt6.QtCore import QTimer
-            QTimer.singleShot(200, self._macos_window_fix)
+            event.accept()
+            QApplication.instance().exit(1)
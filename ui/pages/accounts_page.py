@@ -1,10 +1,17 @@
 from PyQt6.QtWidgets import (QWidget, QVBoxLayout, QHBoxLayout, QListWidget,
                              QPushButton, QLabel, QMessageBox, QListWidgetItem,
                              QProgressBar, QFrame, QDialog, QTextEdit, QFormLayout,
-                             QFileDialog, QLineEdit)
-from PyQt6.QtCore import Qt, QThread, pyqtSignal
+                             QFileDialog, QLineEdit, QListView, QAbstractItemView, QSpinBox, QMenu)
+from PyQt6.QtCore import Qt, QObject, QTimer, pyqtSignal, QAbstractListModel, QModelIndex
 from PyQt6.QtGui import QColor
 from pathlib import Path
+from dataclasses import dataclass
+from concurrent.futures import ThreadPoolExecutor
+from collections import deque
+from functools import partial
+import os
+import re
+import json
 import asyncio
 import platform
 from telethon import TelegramClient
@@ -12,8 +19,113 @@ from telethon.sessions import StringSession
 from config import config
 from core.database import db_manager
 from core.telegram_client import telegram_client
+from core.scan_clients import scan_clients, disconnect_scan_clients
 from loguru import logger
 
+# 从 user_name 中提取括号内的手机号
+_PHONE_RE = re.compile(r'\((\d+)\)')
+
+# 扫描结果缓存：session文件路径 -> [大小, 修改时间(ns), 状态, 用户信息]，文件未变化时跳过网络验证
+_SCAN_CACHE_PATH = Path(config.database.path).parent / "session_scan_cache.json"
+# 只缓存确定的验证结果，网络错误等情况下次仍重新验证
+_CACHEABLE_STATUS = frozenset({"有效", "未授权"})
+# 扫描后保持连接的有效session要等客户端断开（Telethon最后一次写入文件）后才能记录缓存，先暂存于此
+_pending_scan_results = {}
+
+# 扫描时单个session连接/请求的超时（秒），失效的session不走Telethon默认的重试流程
+_SCAN_TIMEOUT = 8
+
+# 有效的Telethon session文件通常为24-64KB，越接近此大小越先验证，尽早得到有效结果
+_TYPICAL_SESSION_SIZE = 40_960
+
+# 扫描进度消息模板，由对话框在显示时才格式化：状态码 -> 模板(session名, 详情)
+_SCAN_MESSAGES = {
+    "checking": "验证中: {0}",
+    "error": "错误: {0} - {1}",
+    "ok": "✓ {0} - {1}",
+    "fail": "✗ {0} - {1}",
+}
+
+# Telethon 的 .session 文件是 SQLite 数据库，以此文件头开始
+_SQLITE_MAGIC = b"SQLite format 3\x00"
+
+# 账号状态颜色，所有行共用同一组实例
+BG_ONLINE = QColor("#d4edda")   # 浅绿色
+FG_ONLINE = QColor("#155724")   # 深绿色
+BG_OFFLINE = QColor("#f8f9fa")  # 浅灰色
+FG_OFFLINE = QColor("#6c757d")  # 灰色
+
+
+@dataclass(slots=True)
+class Account:
+    """账号数据"""
+    name: str
+    phone: str
+    status: str
+    session_file: str
+    session_name: str
+    display: str = ""  # 列表中显示的文字，创建时计算一次
+
+    def __post_init__(self):
+        if not self.display:
+            self.display = f"{self.name} ({self.phone})"
+
+
+class AccountsModel(QAbstractListModel):
+    """账号列表模型，直接使用页面的 accounts_data，只为可见行提供数据"""
+
+    def __init__(self, accounts=None, parent=None):
+        super().__init__(parent)
+        self.accounts = accounts if accounts is not None else []
+
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self.accounts)
+
+    def data(self, index, role=Qt.ItemDataRole.DisplayRole):
+        if not index.isValid():
+            return None
+        account = self.accounts[index.row()]
+
+        if role == Qt.ItemDataRole.DisplayRole:
+            return account.display
+        if role == Qt.ItemDataRole.UserRole:
+            return account
+        # 根据状态设置颜色
+        if role == Qt.ItemDataRole.BackgroundRole:
+            return BG_ONLINE if account.status == 'online' else BG_OFFLINE
+        if role == Qt.ItemDataRole.ForegroundRole:
+            return FG_ONLINE if account.status == 'online' else FG_OFFLINE
+        return None
+
+    def set_accounts(self, accounts):
+        """替换底层账号列表并重置视图"""
+        self.beginResetModel()
+        self.accounts = accounts
+        self.endResetModel()
+
+    def append_rows(self, accounts):
+        """在末尾追加账号行"""
+        if not accounts:
+            return
+        first = len(self.accounts)
+        self.beginInsertRows(QModelIndex(), first, first + len(accounts) - 1)
+        self.accounts.extend(accounts)
+        self.endInsertRows()
+
+    def remove_rows(self, rows):
+        """按行号删除账号（从后往前删除，避免行号偏移）"""
+        for row in sorted(rows, reverse=True):
+            self.beginRemoveRows(QModelIndex(), row, row)
+            del self.accounts[row]
+            self.endRemoveRows()
+
+    def refresh_all(self):
+        """通知视图账号状态已变化：只发送一次 dataChanged，视图只重绘可见行"""
+        if not self.accounts:
+            return
+        roles = [Qt.ItemDataRole.DisplayRole, Qt.ItemDataRole.BackgroundRole, Qt.ItemDataRole.ForegroundRole]
+        self.dataChanged.emit(self.index(0), self.index(len(self.accounts) - 1), roles)
+
 
 class AccountsPage(QWidget):
     """账号管理页面"""
@@ -21,11 +133,18 @@ class AccountsPage(QWidget):
     def __init__(self):
         super().__init__()
         self.accounts_data = []  # 存储账号数据
-        self.import_worker = None  # 导入工作线程
-        self.workers = []  # 存储工作线程引用
+        self._by_session = {}  # session_name -> Account，与 accounts_data 同步维护
+        self._online_count = 0  # 在线账号数，状态变化时增量维护
+        self._last_stats = (0, 0)  # 统计标签当前显示的 (总数, 在线数)
+        self.import_worker = None  # 导入任务
+        self.workers = []  # 存储导入任务引用
+        self._pending_tasks = []  # 主循环就绪前排队的协程
+        self._import_saves = []  # 本次导入中各批次的保存任务
+        self._ui_dirty = False  # 列表需要重建
+        self._flush_scheduled = False  # 已安排在下一轮事件循环重建
+        self._db_rev = None  # 上次加载时数据库的写入修订号
         self.setup_ui()
         # 延迟一小段时间加载，确保主循环已就绪
-        from PyQt6.QtCore import QTimer
         QTimer.singleShot(100, self.load_accounts_from_db)
 
     def setup_ui(self):
@@ -63,9 +182,13 @@ class AccountsPage(QWidget):
         list_title = QLabel("账号列表")
         list_layout.addWidget(list_title)
 
-        self.account_list = QListWidget()
-        self.account_list.setSelectionMode(QListWidget.SelectionMode.MultiSelection)
-        self.account_list.itemSelectionChanged.connect(self.on_selection_changed)
+        self.account_model = AccountsModel(self.accounts_data, self)
+        self.account_list = QListView()
+        self.account_list.setModel(self.account_model)
+        self.account_list.setSelectionMode(QAbstractItemView.SelectionMode.MultiSelection)
+        # 所有行都是单行文字、高度相同，视图只需测量一次行高
+        self.account_list.setUniformItemSizes(True)
+        self.account_list.selectionModel().selectionChanged.connect(self.on_selection_changed)
         list_layout.addWidget(self.account_list)
 
         list_widget = QWidget()
@@ -146,11 +269,38 @@ class AccountsPage(QWidget):
         """)
         layout.addWidget(self.progress_bar)
 
+        # 非阻塞的操作结果提示，一段时间后自动清除
+        self.toast = QLabel("")
+        self.toast.setWordWrap(True)
+        self.toast.setStyleSheet("color: #155724; background-color: #d4edda; border-radius: 3px; padding: 6px;")
+        self.toast.setVisible(False)
+        layout.addWidget(self.toast)
+
+        self._toast_timer = QTimer(self)
+        self._toast_timer.setSingleShot(True)
+        self._toast_timer.timeout.connect(lambda: self.toast.setVisible(False))
+
+    def _show_toast(self, message, timeout=4000):
+        """显示操作结果提示，不阻塞事件循环"""
+        self.toast.setText(message)
+        self.toast.setVisible(True)
+        self._toast_timer.start(timeout)
+
+    def showEvent(self, event):
+        """切换回本页面时，数据库有新写入才重新加载"""
+        super().showEvent(event)
+        if self._db_rev is not None:
+            self.load_accounts_from_db()
+
     def load_accounts_from_db(self):
         """从数据库加载账号列表 (Fixed: 使用 asyncio.create_task)"""
         async def _load():
             try:
-                sessions = await db_manager.get_all_sessions()
+                rev, sessions = await db_manager.get_all_sessions_cached(self._db_rev)
+                if sessions is None:
+                    # 数据库自上次加载后没有写入，内存中的账号列表仍是最新的
+                    return
+                self._db_rev = rev
                 self.accounts_data = []
 
                 for session in sessions:
@@ -163,28 +313,23 @@ class AccountsPage(QWidget):
                     if not display_name:
                         display_name = '未知用户'
 
-                    # 如果phone_number为空，尝试从user_name中提取
-                    if not phone_number and '(' in user_name and ')' in user_name:
-                        # 从格式如"莫莫 (959690312815)"中提取手机号
-                        try:
-                            phone_part = user_name.split('(')[-1].split(')')[0]
-                            if phone_part.isdigit():
-                                phone_number = phone_part
-                        except:
-                            pass
-
-                    account_data = {
-                        'name': display_name,
-                        'phone': phone_number if phone_number else '未知',
-                        'status': 'online' if session.get('is_active', False) else 'offline',
-                        'session_file': session.get('session_file_path', ''),
-                        'session_name': session_name
-                    }
+                    # 如果phone_number为空，尝试从格式如"莫莫 (959690312815)"的user_name中提取
+                    if not phone_number:
+                        m = _PHONE_RE.search(user_name)
+                        phone_number = m.group(1) if m else ''
+
                     # 确保所有必需的字段都存在
-                    if not account_data.get('session_name'):
+                    if not session_name:
                         logger.warning(f"跳过无效的session: {session_name}")
                         continue
-                    self.accounts_data.append(account_data)
+                    self.accounts_data.append(Account(
+                        name=display_name,
+                        phone=phone_number if phone_number else '未知',
+                        status='online' if session.get('is_active', False) else 'offline',
+                        session_file=session.get('session_file_path', ''),
+                        session_name=session_name
+                    ))
+                self._reindex()
 
                 # UI更新必须在主线程，这里已经是主线程的异步回调，所以安全
                 self.load_accounts_ui()
@@ -193,72 +338,86 @@ class AccountsPage(QWidget):
                 print(f"Load Error: {e}")
                 QMessageBox.critical(self, "错误", f"加载账号数据失败: {str(e)}")
 
-        # 安全地创建任务，避免在应用程序关闭时出现未等待的协程警告
-        try:
-            loop = asyncio.get_running_loop()
-            task = loop.create_task(_load())
-            task.add_done_callback(lambda t: t.exception() if t.exception() else None)
-        except RuntimeError:
-            # 如果没有运行中的事件循环，直接运行
-            import asyncio as asyncio_module
-            loop = asyncio_module.new_event_loop()
-            asyncio_module.set_event_loop(loop)
-            try:
-                loop.run_until_complete(_load())
-            finally:
-                loop.close()
+        self._run_async_task(_load())
 
     def load_accounts_ui(self):
-        """更新UI显示账号列表"""
+        """更新UI显示账号列表：同一轮事件循环内的多次调用合并为一次重建"""
+        self._ui_dirty = True
+        if not self._flush_scheduled:
+            self._flush_scheduled = True
+            QTimer.singleShot(0, self._flush_ui)
+
+    def _flush_ui(self):
+        """重建账号列表"""
+        self._flush_scheduled = False
+        if not self._ui_dirty:
+            return
+        self._ui_dirty = False
         try:
-            self.account_list.clear()
-
-            for account in self.accounts_data:
-                # 再次验证数据完整性
-                if not isinstance(account, dict) or 'session_name' not in account:
-                    logger.error(f"跳过无效的账号数据: {account}")
-                    continue
-
-                item_text = f"{account['name']} ({account['phone']})"
-                item = QListWidgetItem(item_text)
-                item.setData(Qt.ItemDataRole.UserRole, account)
-
-                # 根据状态设置颜色
-                if account['status'] == 'online':
-                    item.setBackground(QColor("#d4edda"))  # 浅绿色
-                    item.setForeground(QColor("#155724"))  # 深绿色
-                else:
-                    item.setBackground(QColor("#f8f9fa"))  # 浅灰色
-                    item.setForeground(QColor("#6c757d"))  # 灰色
-
-                self.account_list.addItem(item)
-
+            # 再次验证数据完整性
+            invalid = [a for a in self.accounts_data if not isinstance(a, Account) or not a.session_name]
+            for account in invalid:
+                logger.error(f"跳过无效的账号数据: {account}")
+            if invalid:
+                self.accounts_data = [a for a in self.accounts_data if isinstance(a, Account) and a.session_name]
+                self._reindex()
+
+            self.account_model.set_accounts(self.accounts_data)
             self.update_stats()
 
         except Exception as e:
             QMessageBox.critical(self, "错误", f"加载账号列表失败: {str(e)}")
 
+    def _selected_accounts(self):
+        """返回当前选中行对应的账号数据"""
+        rows = sorted(idx.row() for idx in self.account_list.selectionModel().selectedRows())
+        return [self.account_model.accounts[row] for row in rows]
+
+    def _reindex(self):
+        """重建 session 索引并重新统计在线账号数（整体替换账号数据后调用）"""
+        self._by_session = {a.session_name: a for a in self.accounts_data}
+        self._online_count = sum(1 for a in self.accounts_data if a.status == 'online')
+
+    def _set_status(self, account, status):
+        """设置账号状态，同时更新在线账号计数"""
+        if account.status == status:
+            return False
+        if status == 'online':
+            self._online_count += 1
+        elif account.status == 'online':
+            self._online_count -= 1
+        account.status = status
+        return True
+
+    def _update_statuses(self, session_names, status):
+        """按 session 名称设置账号状态，返回是否有账号的状态发生变化"""
+        changed = False
+        for session_name in session_names:
+            account = self._by_session.get(session_name)
+            if account is not None and self._set_status(account, status):
+                changed = True
+        return changed
+
     def update_stats(self):
         """更新统计信息"""
-        total_count = self.account_list.count()
-        online_count = 0
-        offline_count = 0
-
-        for i in range(total_count):
-            item = self.account_list.item(i)
-            account = item.data(Qt.ItemDataRole.UserRole)
-            if account.get('status') == 'online':
-                online_count += 1
-            else:
-                offline_count += 1
+        total_count = len(self.accounts_data)
+        online_count = self._online_count
+        last_total, last_online = self._last_stats
+        # 数值没有变化时不重设文字，避免标签重新排版
+        if total_count == last_total and online_count == last_online:
+            return
+        self._last_stats = (total_count, online_count)
 
-        self.stats_total.setText(f"总账号: {total_count}")
-        self.stats_online.setText(f"在线: {online_count}")
-        self.stats_offline.setText(f"离线: {offline_count}")
+        if total_count != last_total:
+            self.stats_total.setText(f"总账号: {total_count}")
+        if online_count != last_online:
+            self.stats_online.setText(f"在线: {online_count}")
+        self.stats_offline.setText(f"离线: {total_count - online_count}")
 
     def on_selection_changed(self):
         """选择改变时更新按钮状态"""
-        selected_count = len(self.account_list.selectedItems())
+        selected_accounts = self._selected_accounts()
+        selected_count = len(selected_accounts)
 
         self.btn_start.setEnabled(selected_count > 0)
         self.btn_stop.setEnabled(selected_count > 0)
@@ -266,12 +425,11 @@ class AccountsPage(QWidget):
 
         # 更新详情面板
         if selected_count == 1:
-            item = self.account_list.selectedItems()[0]
-            account = item.data(Qt.ItemDataRole.UserRole)
-            status_text = "在线" if account.get('status') == 'online' else "离线"
+            account = selected_accounts[0]
+            status_text = "在线" if account.status == 'online' else "离线"
             details = f"""
-账号名称: {account['name']}
-手机号: {account['phone']}
+账号名称: {account.name}
+手机号: {account.phone}
 状态: {status_text}
             """.strip()
             self.details_info.setText(details)
@@ -284,35 +442,39 @@ class AccountsPage(QWidget):
         if dialog.exec() == QDialog.DialogCode.Accepted:
             sessions_to_add = dialog.get_accounts()
             if sessions_to_add:
-                # 创建并启动导入工作线程
-                self.import_worker = SessionImportWorker(sessions_to_add, self.accounts_data.copy())
+                # 创建并启动导入任务
+                self.import_worker = SessionImportWorker(
+                    sessions_to_add, frozenset(a.session_file for a in self.accounts_data), self
+                )
+                self._import_saves = []
+                self.import_worker.batch_ready.connect(self._on_batch_ready)
                 self.import_worker.import_completed.connect(self._on_import_completed)
+                self.import_worker.progress_updated.connect(self._on_import_progress)
                 self.import_worker.error_occurred.connect(self._on_import_error)
+                self.progress_bar.setRange(0, len(sessions_to_add))
+                self.progress_bar.setValue(0)
+                self.progress_bar.setVisible(True)
                 self.workers.append(self.import_worker)
                 self.import_worker.start()
 
 
     def start_selected_accounts(self):
         """启动选中的账号"""
-        selected_items = self.account_list.selectedItems()
-        if not selected_items:
+        selected_accounts = self._selected_accounts()
+        if not selected_accounts:
             return
 
         self.progress_bar.setVisible(True)
         self.progress_bar.setRange(0, 0)
         self.btn_start.setEnabled(False)
 
-        session_names = []
-        for item in selected_items:
-            account = item.data(Qt.ItemDataRole.UserRole)
-            if not isinstance(account, dict) or 'session_name' not in account:
-                continue
-            session_names.append(account['session_name'])
+        session_names = [account.session_name for account in selected_accounts if account.session_name]
 
         async def _start_async():
             try:
                 success_count = 0
                 failed_sessions = []
+                started = []
                 total = len(session_names)
 
                 for session_name in session_names:
@@ -320,6 +482,7 @@ class AccountsPage(QWidget):
                         # 核心修改：直接await telegram_client操作，而不是在线程中
                         if await telegram_client.start_session(session_name):
                             success_count += 1
+                            started.append(session_name)
                         else:
                             failed_sessions.append(f"{session_name} (启动失败)")
                     except Exception as e:
@@ -333,15 +496,10 @@ class AccountsPage(QWidget):
                 self.progress_bar.setVisible(False)
                 self.btn_start.setEnabled(True)
 
-                # 更新内存状态
-                for account in self.accounts_data:
-                    # 简单逻辑：如果没在失败列表里且在本次操作列表中，则设为online
-                    if account['session_name'] in session_names:
-                        is_failed = any(account['session_name'] in f for f in failed_sessions)
-                        if not is_failed:
-                            account['status'] = 'online'
-
-                self.load_accounts_ui()
+                # 通过 session 索引更新启动成功的账号，有状态变化时才通知视图
+                if self._update_statuses(started, 'online'):
+                    self.account_model.refresh_all()
+                self.update_stats()
 
                 message = f"启动操作完成，成功: {success_count}/{total}"
                 if failed_sessions:
@@ -349,7 +507,7 @@ class AccountsPage(QWidget):
                     if len(failed_sessions) > 3:
                         message += f"\n... 等 {len(failed_sessions)-3} 个"
 
-                QMessageBox.information(self, "完成", message)
+                self._show_toast(message)
 
             except Exception as e:
                 self.progress_bar.setVisible(False)
@@ -360,15 +518,12 @@ class AccountsPage(QWidget):
 
     def stop_selected_accounts(self):
         """停止选中的账号"""
-        selected_items = self.account_list.selectedItems()
-        if not selected_items:
+        selected_accounts = self._selected_accounts()
+        if not selected_accounts:
             return
 
         # 收集要停止的session名称
-        session_names = []
-        for item in selected_items:
-            account = item.data(Qt.ItemDataRole.UserRole)
-            session_names.append(account['session_name'])
+        session_names = [account.session_name for account in selected_accounts]
 
         async def _stop_async():
             try:
@@ -378,14 +533,14 @@ class AccountsPage(QWidget):
                     except Exception as e:
                         logger.error(f"停止账号 {session_name} 失败: {e}")
 
-                # 更新状态
-                for account in self.accounts_data:
-                    if account['session_name'] in session_names:
-                        account['status'] = 'offline'
+                # 通过 session 索引更新状态，有状态变化时才通知视图
+                changed = self._update_statuses(session_names, 'offline')
 
                 self.btn_stop.setEnabled(True)
-                self.load_accounts_ui()
-                QMessageBox.information(self, "成功", "已停止选中账号")
+                if changed:
+                    self.account_model.refresh_all()
+                self.update_stats()
+                self._show_toast("已停止选中账号")
 
             except Exception as e:
                 self.btn_stop.setEnabled(True)
@@ -395,13 +550,13 @@ class AccountsPage(QWidget):
 
     def delete_selected_accounts(self):
         """删除选中的账号"""
-        selected_items = self.account_list.selectedItems()
-        if not selected_items:
+        selected_accounts = self._selected_accounts()
+        if not selected_accounts:
             return
 
         reply = QMessageBox.question(
             self, "确认删除",
-            f"确定要删除选中的 {len(selected_items)} 个账号吗？\n\n此操作不可撤销！",
+            f"确定要删除选中的 {len(selected_accounts)} 个账号吗？\n\n此操作不可撤销！",
             QMessageBox.StandardButton.Yes | QMessageBox.StandardButton.No
         )
 
@@ -409,10 +564,7 @@ class AccountsPage(QWidget):
             self.btn_delete.setEnabled(False)
 
             # 收集要删除的账号信息
-            accounts_to_delete = []
-            for item in selected_items:
-                account = item.data(Qt.ItemDataRole.UserRole)
-                accounts_to_delete.append(account)
+            accounts_to_delete = list(selected_accounts)
 
             # 直接在主线程中执行异步操作
             import asyncio
@@ -421,7 +573,7 @@ class AccountsPage(QWidget):
                 try:
                     deleted = []
                     for account in accounts_to_delete:
-                        session_name = account['session_name']
+                        session_name = account.session_name
                         try:
                             # 停止并删除session
                             await telegram_client.delete_session(session_name)
@@ -429,14 +581,24 @@ class AccountsPage(QWidget):
                         except Exception as e:
                             logger.error(f"删除账号 {session_name} 失败: {e}")
 
-                    # 从内存移除
-                    for acc in deleted:
-                        if acc in self.accounts_data:
-                            self.accounts_data.remove(acc)
+                    # 从索引和内存移除，只删除对应的行
+                    deleted_names = set()
+                    for account in deleted:
+                        acc = self._by_session.pop(account.session_name, None)
+                        if acc is not None:
+                            deleted_names.add(acc.session_name)
+                            if acc.status == 'online':
+                                self._online_count -= 1
+                    model_accounts = self.account_model.accounts
+                    rows = [row for row, acc in enumerate(model_accounts) if acc.session_name in deleted_names]
+                    self.account_model.remove_rows(rows)
+                    if self.accounts_data is not model_accounts:
+                        # 账号列表刚被整体替换、尚未刷新到模型，新列表中也要去掉
+                        self.accounts_data = [a for a in self.accounts_data if a.session_name not in deleted_names]
 
                     self.btn_delete.setEnabled(True)
-                    self.load_accounts_ui()
-                    QMessageBox.information(self, "成功", f"已删除 {len(deleted)} 个账号")
+                    self.update_stats()
+                    self._show_toast(f"已删除 {len(deleted)} 个账号")
 
                 except Exception as e:
                     self.btn_delete.setEnabled(True)
@@ -447,169 +609,111 @@ class AccountsPage(QWidget):
 
 
     def cleanup_threads(self):
-        """清理所有工作线程（在程序退出前调用）"""
+        """取消所有导入任务（在程序退出前调用）"""
         for worker in self.workers[:]:  # 复制列表以避免修改时的问题
-            if worker.isRunning():
-                worker.wait(3000)  # 等待最多3秒
+            worker.cancel()
             self.workers.remove(worker)
 
+    def _on_import_progress(self, done, total):
+        """导入进度回调"""
+        self.progress_bar.setRange(0, total)
+        self.progress_bar.setValue(done)
+
+    def _on_batch_ready(self, accounts):
+        """一批账号验证完成：立即显示并开始保存到数据库"""
+        self._by_session.update((a.session_name, a) for a in accounts)
+        self._online_count += sum(1 for a in accounts if a.status == 'online')
+        if self.account_model.accounts is self.accounts_data:
+            # 只插入新行，不重建整个列表
+            self.account_model.append_rows(accounts)
+            self.update_stats()
+        else:
+            # 账号列表刚被整体替换、尚未刷新到模型
+            self.accounts_data.extend(accounts)
+            self.load_accounts_ui()
+
+        self._import_saves.append(asyncio.ensure_future(self._save_accounts_async(accounts)))
+
     def _on_import_completed(self, accounts_to_add):
-        """导入完成回调"""
+        """导入完成回调（各批次已经通过 batch_ready 添加到列表）"""
+        self.progress_bar.setVisible(False)
         added_count = len(accounts_to_add)
         if added_count > 0:
-            # 添加账号到内存列表
-            self.accounts_data.extend(accounts_to_add)
-
-            # 保存到数据库并等待完成，然后刷新UI
-            asyncio.create_task(self._save_and_refresh(accounts_to_add, added_count))
+            # 等待各批次保存完成后提示结果
+            asyncio.create_task(self._finish_import(added_count))
         else:
             QMessageBox.warning(self, "警告", "没有添加新的账号")
-            # 清理导入线程
+            # 清理导入任务
             if self.import_worker and self.import_worker in self.workers:
                 self.workers.remove(self.import_worker)
                 self.import_worker = None
 
-    async def _save_and_refresh(self, accounts_to_add, added_count):
-        """异步保存到数据库并刷新UI"""
+    async def _finish_import(self, added_count):
+        """等待各批次保存完成并提示结果"""
         try:
-            # 保存到数据库
-            await self._save_accounts_async(accounts_to_add)
-
-            # 重新加载显示
-            self.load_accounts_ui()
-            QMessageBox.information(self, "成功", f"成功添加了 {added_count} 个账号")
-
-        except Exception as e:
-            QMessageBox.warning(self, "警告", f"保存到数据库失败，但账号已添加到内存: {e}")
-            # 即使保存失败，也刷新UI显示内存中的账号
-            self.load_accounts_ui()
-            QMessageBox.information(self, "部分成功", f"账号已添加到内存，但保存到数据库失败: {added_count} 个账号")
+            saves, self._import_saves = self._import_saves, []
+            results = await asyncio.gather(*saves, return_exceptions=True)
+            errors = [r for r in results if isinstance(r, BaseException)]
+            if errors:
+                QMessageBox.warning(self, "警告", f"保存到数据库失败，但账号已添加到内存: {errors[0]}")
+                self._show_toast(f"账号已添加到内存，但保存到数据库失败: {added_count} 个账号")
+            else:
+                self._show_toast(f"成功添加了 {added_count} 个账号")
 
         finally:
-            # 清理导入线程
+            # 清理导入任务
             if self.import_worker and self.import_worker in self.workers:
                 self.workers.remove(self.import_worker)
                 self.import_worker = None
 
-    def _on_start_completed(self, results):
-        """启动完成处理"""
-        success_count = results['success_count']
-        failed_sessions = results['failed_sessions']
-
-        self.progress_bar.setVisible(False)
-
-        # 更新内存中的账号状态
-        for account in self.accounts_data:
-            if account['session_name'] in [s.split(' ')[0] for s in results.get('failed_sessions', []) if ' ' in s]:
-                account['status'] = 'offline'
-            else:
-                # 假设启动的账号都成功了（这里可以优化，但暂时这样处理）
-                account['status'] = 'online' if success_count > 0 else account['status']
-
-        self.load_accounts_ui()  # 刷新UI状态
-
-        message = f"尝试启动完成，成功: {success_count}/{results['total_count']}"
-        if failed_sessions:
-            message += f"\n\n失败的账号:\n" + "\n".join(f"• {session}" for session in failed_sessions[:3])
-            if len(failed_sessions) > 3:
-                message += f"\n... 等 {len(failed_sessions) - 3} 个账号"
-
-        QMessageBox.information(self, "完成", message)
-
-        # 清理工作线程
-        if self.start_worker and self.start_worker in self.workers:
-            self.workers.remove(self.start_worker)
-            self.start_worker = None
-
-    def _on_start_error(self, error_msg):
-        """启动错误处理"""
-        self.progress_bar.setVisible(False)
-        QMessageBox.critical(self, "错误", f"启动账号时出现错误: {error_msg}")
-
-        # 清理工作线程
-        if self.start_worker and self.start_worker in self.workers:
-            self.workers.remove(self.start_worker)
-            self.start_worker = None
-
-    def _on_stop_completed(self):
-        """停止完成处理"""
-        self.load_accounts_ui()
-        QMessageBox.information(self, "成功", "已停止选中账号")
-
-        # 清理工作线程
-        if self.stop_worker and self.stop_worker in self.workers:
-            self.workers.remove(self.stop_worker)
-            self.stop_worker = None
-
-    def _on_stop_error(self, error_msg):
-        """停止错误处理"""
-        QMessageBox.critical(self, "错误", f"停止账号时出现错误: {error_msg}")
-
-        # 清理工作线程
-        if self.stop_worker and self.stop_worker in self.workers:
-            self.workers.remove(self.stop_worker)
-            self.stop_worker = None
-
-    def _on_delete_completed(self, deleted_accounts):
-        """删除完成处理"""
-        # 从内存数据中移除已删除的账号
-        for account in deleted_accounts:
-            if account in self.accounts_data:
-                self.accounts_data.remove(account)
-
-        self.load_accounts_ui()
-        QMessageBox.information(self, "成功", "账号已删除")
-
-        # 清理工作线程
-        if self.delete_worker and self.delete_worker in self.workers:
-            self.workers.remove(self.delete_worker)
-            self.delete_worker = None
-
-    def _on_delete_error(self, error_msg):
-        """删除错误处理"""
-        QMessageBox.critical(self, "错误", f"删除账号时出现错误: {error_msg}")
-
-        # 清理工作线程
-        if self.delete_worker and self.delete_worker in self.workers:
-            self.workers.remove(self.delete_worker)
-            self.delete_worker = None
-
     def _run_async_task(self, coro):
         """辅助方法：在主循环中运行协程"""
         try:
             loop = asyncio.get_running_loop()
-            task = loop.create_task(coro)
-            # 捕获未处理的异常
-            def handle_exception(t):
-                if t.exception():
-                    logger.error(f"Async task exception: {t.exception()}")
-            task.add_done_callback(handle_exception)
         except RuntimeError:
-            # 如果没有运行中的循环（极少情况），创建一个新的
-            loop = asyncio.new_event_loop()
-            asyncio.set_event_loop(loop)
-            try:
-                loop.run_until_complete(coro)
-            finally:
-                loop.close()
+            # 主循环尚未运行（极少情况）：先排队，稍后再调度，绝不在GUI线程上阻塞运行
+            logger.debug("No running loop, task queued")
+            self._pending_tasks.append(coro)
+            QTimer.singleShot(0, self._flush_pending)
+            return
+
+        task = loop.create_task(coro)
+        # 捕获未处理的异常
+        def handle_exception(t):
+            if not t.cancelled() and t.exception():
+                logger.error(f"Async task exception: {t.exception()}")
+        task.add_done_callback(handle_exception)
+
+    def _flush_pending(self):
+        """主循环运行后调度排队的协程"""
+        try:
+            asyncio.get_running_loop()
+        except RuntimeError:
+            QTimer.singleShot(100, self._flush_pending)
+            return
+
+        pending, self._pending_tasks = self._pending_tasks, []
+        for coro in pending:
+            self._run_async_task(coro)
 
     async def _save_accounts_async(self, accounts):
         """异步保存账号到数据库"""
         try:
-            for account in accounts:
-                session_name = account.get('session_name', account.get('name', 'unknown'))
-
-                # 准备数据库数据
-                session_data = {
-                    'session_name': session_name,
-                    'session_file_path': account.get('session_file', ''),
-                    'phone_number': account.get('phone', ''),
-                    'user_name': account.get('name', ''),
-                    'is_active': account.get('status') == 'online'
+            # 准备数据库数据
+            sessions = [
+                {
+                    'session_name': account.session_name or account.name or 'unknown',
+                    'session_file_path': account.session_file,
+                    'phone_number': account.phone,
+                    'user_name': account.name,
+                    'is_active': account.status == 'online'
                 }
+                for account in accounts
+            ]
 
-                # 保存到数据库
-                await db_manager.save_session(**session_data)
+            # 一次性保存到数据库（同一事务）
+            if not await db_manager.save_sessions_bulk(sessions):
+                raise RuntimeError("批量保存账号失败")
 
             logger.info(f"Successfully saved {len(accounts)} accounts to DB")
 
@@ -617,262 +721,469 @@ class AccountsPage(QWidget):
             logger.error(f"Save Error: {e}")
             raise e  # 重新抛出异常，让调用者处理
 
-    def _cleanup_worker(self, worker):
-        """清理已完成的线程引用"""
-        if worker in self.workers:
-            self.workers.remove(worker)
-
-    def _on_save_error(self, worker, error_msg):
-        """保存错误处理"""
-        QMessageBox.warning(self, "警告", f"保存到数据库失败，但账号已添加到内存: {error_msg}")
-        self._cleanup_worker(worker)
-
     def _on_import_error(self, error_msg):
         """导入错误处理"""
+        self.progress_bar.setVisible(False)
         QMessageBox.critical(self, "错误", f"导入过程中出现错误: {error_msg}")
 
 
-class SessionImportWorker(QThread):
-    """Session账号导入工作线程"""
+class SessionImportWorker(QObject):
+    """Session账号导入任务，直接在主线程的事件循环中运行"""
     import_completed = pyqtSignal(list)  # 返回要添加的账号列表
+    batch_ready = pyqtSignal(list)  # 每验证完 batch_size 个账号发送一批
+    progress_updated = pyqtSignal(int, int)  # 已验证数, 总数
     error_occurred = pyqtSignal(str)  # 错误信息
 
-    def __init__(self, sessions, existing_accounts):
-        super().__init__()
-        self.sessions = sessions
-        self.existing_accounts = existing_accounts  # 现有的账号列表，用于检查重复
+    # 同时验证的session数量上限（受Telegram DC连接频率限制）
+    max_concurrency = 20
+    # 每批发送给界面的账号数
+    batch_size = 25
 
-    def run(self):
-        """在工作线程中执行导入"""
-        try:
-            accounts_to_add = []
+    def __init__(self, sessions, existing_files, parent=None):
+        super().__init__(parent)
+        self.sessions = sessions
+        self.existing_files = existing_files  # 现有账号的session文件集合，用于检查重复
+        self._task = None
 
-            for session_info in self.sessions:
-                try:
-                    session_file = session_info['session_file']
-                    session_name = session_info['session_name']
-
-                    # 快速验证session文件
-                    import os
-                    if not os.path.exists(session_file) or os.path.getsize(session_file) == 0:
-                        # 文件不存在或为空，仍然添加基本信息
-                        account_data = {
-                            'name': session_name,
-                            'phone': '文件无效',
-                            'status': 'offline',
-                            'session_file': session_file,
-                            'session_name': session_name
-                        }
-                    else:
-                        # 尝试快速验证session文件格式
-                        try:
-                            from telethon import TelegramClient
-                            from telethon.sessions import StringSession
-                            import asyncio
-
-                            # 使用和SessionScanWorker相同的方法验证
-                            async def validate_session():
-                                # 尝试创建客户端实例来验证session文件
-                                client = TelegramClient(
-                                    session=str(session_file),
-                                    api_id=config.telegram.api_id,
-                                    api_hash=config.telegram.api_hash
-                                )
-
-                                try:
-                                    # 尝试连接验证session
-                                    await client.connect()
-
-                                    # 检查是否已授权
-                                    if await client.is_user_authorized():
-                                        try:
-                                            me = await client.get_me()
-                                            phone = me.phone or '未知'
-                                            return {
-                                                'name': session_name,
-                                                'phone': f'{me.first_name or "未知"} ({phone})',
-                                                'status': 'offline',
-                                                'session_file': session_file
-                                            }
-                                        except Exception:
-                                            # 即使获取用户信息失败，也认为session有效
-                                            return {
-                                                'name': session_name,
-                                                'phone': '验证通过',
-                                                'status': 'offline',
-                                                'session_file': session_file
-                                            }
-                                    else:
-                                        return {
-                                            'name': session_name,
-                                            'phone': '未授权',
-                                            'status': 'offline',
-                                            'session_file': session_file
-                                        }
-
-                                finally:
-                                    await client.disconnect()
-
-                            # 创建事件循环验证session
-                            loop = asyncio.new_event_loop()
-                            asyncio.set_event_loop(loop)
-
-                            try:
-                                account_data = loop.run_until_complete(validate_session())
-                            finally:
-                                loop.close()
+    def start(self):
+        """在当前事件循环中启动导入"""
+        self._task = asyncio.ensure_future(self._run())
 
-                        except Exception as e:
-                            # session文件格式错误，仍添加基本信息
-                            error_msg = str(e)
-                            if "Invalid base64" in error_msg or "Not a valid string" in error_msg:
-                                error_msg = "无效的session文件格式"
-                            elif "codec" in error_msg.lower():
-                                error_msg = "文件编码格式错误"
-                            elif "session文件为空" in error_msg:
-                                error_msg = "session文件为空"
-                            elif "无法读取" in error_msg:
-                                error_msg = "无法读取session文件"
-                            else:
-                                error_msg = f"格式错误: {error_msg[:15]}"
-
-                            account_data = {
-                                'name': session_name,
-                                'phone': error_msg,
-                                'status': 'offline',
-                                'session_file': session_file,
-                                'session_name': session_name
-                            }
-                        except Exception as e:
-                            # session文件格式错误，仍添加基本信息
-                            error_msg = str(e)
-                            if "Invalid base64" in error_msg or "Not a valid string" in error_msg:
-                                error_msg = "无效的session文件格式"
-                            elif "codec" in error_msg.lower():
-                                error_msg = "文件编码格式错误"
-                            elif "session文件为空" in error_msg:
-                                error_msg = "session文件为空"
-                            elif "无法读取" in error_msg:
-                                error_msg = "无法读取session文件"
-                            else:
-                                error_msg = f"格式错误: {error_msg[:15]}"
-
-                            account_data = {
-                                'name': session_name,
-                                'phone': error_msg,
-                                'status': 'offline',
-                                'session_file': session_file,
-                                'session_name': session_name
-                            }
-
-                    # 检查是否已存在相同的账号（通过session文件路径）
-                    exists = any(
-                        acc.get('session_file') == session_file
-                        for acc in self.existing_accounts
-                    )
+    def cancel(self):
+        """取消导入，正在进行的验证会立即中断"""
+        if self._task is not None and not self._task.done():
+            self._task.cancel()
 
-                    if not exists:
-                        accounts_to_add.append(account_data)
+    async def _run(self):
+        try:
+            seen = set()  # 本批次中已出现的session文件
+            pending = []
 
-                except Exception as e:
-                    # 单个session处理失败，跳过
+            for session_info in self.sessions:
+                # 检查是否已存在相同的账号（通过session文件路径），重复的无需再验证
+                session_file = session_info.get('session_file')
+                if session_file in self.existing_files or session_file in seen:
                     continue
+                seen.add(session_file)
+                pending.append(session_info)
 
-            self.import_completed.emit(accounts_to_add)
+            self.import_completed.emit(await self._validate_all(pending))
 
+        except asyncio.CancelledError:
+            raise
         except Exception as e:
             self.error_occurred.emit(str(e))
 
+    async def _validate_all(self, sessions):
+        """并发验证session，同时进行的数量受 max_concurrency 限制"""
+        semaphore = asyncio.Semaphore(self.max_concurrency)
+        total = len(sessions)
+        done = 0
+        buffer = []
 
+        async def _bounded(session_info):
+            nonlocal done, buffer
+            try:
+                async with semaphore:
+                    account = await self._validate_session(session_info)
+                buffer.append(account)
+                if len(buffer) >= self.batch_size:
+                    self.batch_ready.emit(buffer)
+                    buffer = []
+                return account
+            finally:
+                done += 1
+                self.progress_updated.emit(done, total)
 
-class SessionScanWorker(QThread):
-    """Session文件扫描工作线程"""
-    progress_updated = pyqtSignal(int, str)  # 进度, 消息
-    scan_completed = pyqtSignal(list)  # 结果
-    error_occurred = pyqtSignal(str)  # 错误
-
-    def __init__(self, file_paths):
-        super().__init__()
-        self.file_paths = file_paths
+        # 正在使用的客户端按session文件的真实路径记录，取消导入时统一断开
+        self._clients = {}
+        # 扫描保留的客户端附带的回调，客户端断开后执行
+        self._on_closed = {}
 
-    def run(self):
-        """在工作线程中执行扫描"""
         try:
-            # 创建新的asyncio事件循环
-            loop = asyncio.new_event_loop()
-            asyncio.set_event_loop(loop)
+            results = await asyncio.gather(*(_bounded(info) for info in sessions), return_exceptions=True)
+        finally:
+            # 断开仍然保持连接的客户端
+            await asyncio.gather(
+                *(self._disconnect_client(task, self._on_closed.get(key)) for key, task in self._clients.items()),
+                return_exceptions=True
+            )
+            self._clients.clear()
+            self._on_closed.clear()
+            # 本批次没有用到的扫描客户端（如已存在的账号）也一并断开
+            await disconnect_scan_clients()
+            if buffer:
+                self.batch_ready.emit(buffer)
+
+        # 单个session处理失败，跳过
+        return [result for result in results if not isinstance(result, BaseException)]
+
+    async def _connect_client(self, session_file):
+        """创建客户端并连接"""
+        client = TelegramClient(
+            session=str(session_file),
+            api_id=config.telegram.api_id,
+            api_hash=config.telegram.api_hash
+        )
+        await client.connect()
+        return client
+
+    async def _acquire_client(self, key, session_file):
+        """返回session文件已连接的客户端，优先复用扫描时保留的连接"""
+        client, on_closed = await scan_clients.take(key)
+        if on_closed is not None:
+            self._on_closed[key] = on_closed
+        if client is not None:
+            # 扫描时已经连接的客户端，直接使用
+            task = asyncio.get_running_loop().create_future()
+            task.set_result(client)
+        else:
+            task = asyncio.ensure_future(self._connect_client(session_file))
+        self._clients[key] = task
+        return await task
+
+    async def _release_client(self, key):
+        """断开验证完成的客户端"""
+        task = self._clients.pop(key, None)
+        on_closed = self._on_closed.pop(key, None)
+        if task is not None:
+            await self._disconnect_client(task, on_closed)
+
+    @staticmethod
+    async def _disconnect_client(task, on_closed=None):
+        if task.done() and not task.cancelled() and task.exception() is None:
+            await task.result().disconnect()
+            if on_closed is not None:
+                on_closed()
+
+    async def _validate_session(self, session_info):
+        """验证单个session文件，返回账号数据"""
+        session_file = session_info['session_file']
+        session_name = session_info['session_name']
+
+        # 快速验证session文件：一次stat同时判断是否存在和是否为空
+        try:
+            size = os.stat(session_file).st_size
+        except OSError:
+            size = 0
+        if size == 0:
+            # 文件不存在或为空，仍然添加基本信息
+            return Account(
+                name=session_name,
+                phone='文件无效',
+                status='offline',
+                session_file=session_file,
+                session_name=session_name
+            )
 
+        # 尝试快速验证session文件格式
+        key = str(Path(session_file).resolve())
+        try:
+            # 使用和SessionScanWorker相同的方法验证
             try:
-                result = loop.run_until_complete(self._scan_sessions_async())
-                self.scan_completed.emit(result)
+                # 尝试连接验证session
+                client = await self._acquire_client(key, session_file)
+
+                # 检查是否已授权
+                if await client.is_user_authorized():
+                    try:
+                        me = await client.get_me()
+                        phone = me.phone or '未知'
+                        return Account(
+                            name=session_name,
+                            phone=f'{me.first_name or "未知"} ({phone})',
+                            status='offline',
+                            session_file=session_file,
+                            session_name=session_name
+                        )
+                    except Exception:
+                        # 即使获取用户信息失败，也认为session有效
+                        return Account(
+                            name=session_name,
+                            phone='验证通过',
+                            status='offline',
+                            session_file=session_file,
+                            session_name=session_name
+                        )
+                else:
+                    return Account(
+                        name=session_name,
+                        phone='未授权',
+                        status='offline',
+                        session_file=session_file,
+                        session_name=session_name
+                    )
+
             finally:
-                loop.close()
+                await self._release_client(key)
 
+        except Exception as e:
+            # session文件格式错误，仍添加基本信息
+            error_msg = str(e)
+            if "Invalid base64" in error_msg or "Not a valid string" in error_msg:
+                error_msg = "无效的session文件格式"
+            elif "codec" in error_msg.lower():
+                error_msg = "文件编码格式错误"
+            elif "session文件为空" in error_msg:
+                error_msg = "session文件为空"
+            elif "无法读取" in error_msg:
+                error_msg = "无法读取session文件"
+            else:
+                error_msg = f"格式错误: {error_msg[:15]}"
+
+            return Account(
+                name=session_name,
+                phone=error_msg,
+                status='offline',
+                session_file=session_file,
+                session_name=session_name
+            )
+
+
+
+class SessionScanWorker(QObject):
+    """Session文件扫描任务，直接在主线程的事件循环中运行"""
+    scan_completed = pyqtSignal(list)  # 结果
+    error_occurred = pyqtSignal(str)  # 错误
+
+    def __init__(self, file_paths, max_concurrency=8, parent=None):
+        super().__init__(parent)
+        self.file_paths = file_paths
+        self.max_concurrency = max_concurrency  # 同时验证的session数量上限
+        self._task = None
+        # 进度消息 (行号, 消息)，不逐条发送信号，由对话框的定时器定期取走
+        self.updates = deque()
+        self.done = 0  # 已完成验证的文件数
+        # 本地文件检查（stat、文件头、缓存）使用的线程池，与网络验证重叠执行
+        self._io_pool = ThreadPoolExecutor(max_workers=32, thread_name_prefix="session-scan")
+
+    def start(self):
+        """在当前事件循环中启动扫描"""
+        self._task = asyncio.ensure_future(self._run())
+
+    def cancel(self):
+        """取消扫描，正在进行的连接会立即中断"""
+        if self._task is not None and not self._task.done():
+            self._task.cancel()
+
+    async def _run(self):
+        try:
+            self.scan_completed.emit(await self._scan_sessions_async())
+        except asyncio.CancelledError:
+            raise
         except Exception as e:
             self.error_occurred.emit(str(e))
 
     async def _scan_sessions_async(self):
-        """异步扫描session文件"""
-        valid_sessions = []
+        """异步扫描session文件，并发验证，数量受 max_concurrency 限制"""
+        semaphore = asyncio.Semaphore(self.max_concurrency)
 
-        for i, file_path in enumerate(self.file_paths):
+        async def _bounded(i, file_path):
             try:
-                session_file = Path(file_path)
-                session_name = session_file.stem
-
-                # 发送进度更新
-                self.progress_updated.emit(i + 1, f"验证中: {session_name}")
-
-                # 检查文件是否存在且不为空
-                if not session_file.exists() or session_file.stat().st_size == 0:
-                    self.progress_updated.emit(i + 1, f"错误: {session_name} - 文件不存在或为空")
+                async with semaphore:
+                    return await self._validate_one(i, file_path)
+            finally:
+                self.done += 1
+
+        loop = asyncio.get_running_loop()
+        self._cache = _load_scan_cache()
+        self._cache_dirty = False
+        # 扫描期间配置不变，先取出API凭据，避免每个文件都访问配置对象
+        self._api_id = config.telegram.api_id
+        self._api_hash = config.telegram.api_hash
+        report = self._report
+        results = [None] * len(self.file_paths)
+        try:
+            # 先在线程池中并行完成本地检查，只有通过的文件才需要网络验证
+            checks = await asyncio.gather(
+                *(loop.run_in_executor(self._io_pool, self._prefilter, file_path) for file_path in self.file_paths),
+                return_exceptions=True
+            )
+            network = []
+            for i, check in enumerate(checks):
+                session_file = Path(self.file_paths[i])
+                if isinstance(check, BaseException):
+                    report(i + 1, "error", session_file.stem, f"{str(check)[:50]}...")
+                elif check[0]:
+                    report(i + 1, check[0][0], session_file.stem, check[0][1])
+                elif check[1]:
+                    # 文件自上次验证后没有变化，直接使用缓存的结果
+                    results[i] = self._finish_one(i, session_file, session_file.stem, *check[1])
+                else:
+                    network.append(i)
                     continue
+                self.done += 1
 
-                # 尝试创建客户端实例来验证session文件
-                try:
-                    client = TelegramClient(
-                        session=str(session_file),
-                        api_id=config.telegram.api_id,
-                        api_hash=config.telegram.api_hash
-                    )
+            # 按文件大小估计有效的可能性排序后再分发，进度仍按原来的行号更新
+            network.sort(key=lambda i: abs(checks[i][2] - _TYPICAL_SESSION_SIZE))
+            validated = await asyncio.gather(
+                *(_bounded(i, self.file_paths[i]) for i in network),
+                return_exceptions=True
+            )
+            for i, result in zip(network, validated):
+                results[i] = result
+        finally:
+            self._io_pool.shutdown(wait=False)
+            if self._cache_dirty:
+                _save_scan_cache(self._cache)
+        # 保持用户选择的顺序，跳过无效的文件
+        return [result for result in results if isinstance(result, dict)]
+
+    def _prefilter(self, file_path):
+        """本地检查（在线程池中执行），返回 ((状态码, 错误信息), 缓存结果, 文件大小)，前两项都为None时需要网络验证"""
+        # 一次stat同时检查文件是否存在和是否为空，结果也用于缓存键
+        try:
+            st = os.stat(file_path)
+        except FileNotFoundError:
+            return ("error", "文件不存在"), None, 0
+        if st.st_size == 0:
+            return ("error", "文件为空"), None, 0
+
+        cached = self._cache.get(str(Path(file_path)))
+        if cached and cached[0] == st.st_size and cached[1] == st.st_mtime_ns:
+            return None, (cached[2], cached[3]), st.st_size
+
+        # 不是SQLite文件的无需创建客户端
+        if not _is_sqlite(file_path):
+            return ("fail", "文件格式错误"), None, st.st_size
+        return None, None, st.st_size
+
+    def _report(self, index, code, session_name, detail=""):
+        """记录一条进度消息，文字由对话框按 _SCAN_MESSAGES 模板生成"""
+        self.updates.append((index, code, session_name, detail))
+
+    def _finish_one(self, i, session_file, session_name, status, user_info):
+        """发送最终结果，有效时返回session信息"""
+        if status == "有效":
+            self._report(i + 1, "ok", session_name, user_info)
+            return {
+                'session_file': str(session_file),
+                'session_name': session_name
+            }
+        self._report(i + 1, "fail", session_name, user_info)
+        return None
 
-                    # 尝试加载session
-                    await client.connect()
+    async def _validate_one(self, i, file_path):
+        """通过网络验证单个session文件（本地检查已通过），有效时返回session信息，否则返回None"""
+        session_file = Path(file_path)
+        session_name = session_file.stem
+        try:
+            # 发送进度更新
+            self._report(i + 1, "checking", session_name)
 
-                    # 检查是否已连接和授权
-                    if await client.is_user_authorized():
-                        try:
-                            me = await client.get_me()
-                            user_info = f"{me.first_name or '未知'} ({me.phone or '无手机号'})"
-                            status = "有效"
-                        except Exception as e:
-                            user_info = f"用户信息获取失败: {str(e)[:20]}..."
-                            status = "部分有效"
-                    else:
-                        user_info = "未授权"
-                        status = "未授权"
+            # 尝试创建客户端实例来验证session文件，每个任务使用自己的客户端
+            client = None
+            status = None
+            try:
+                client = _scan_client(session_file, self._api_id, self._api_hash)
 
-                    await client.disconnect()
+                # 尝试加载session
+                await asyncio.wait_for(client.connect(), _SCAN_TIMEOUT)
 
-                except Exception as e:
-                    user_info = f"验证失败: {str(e)[:30]}..."
-                    status = "无效"
-
-                # 发送最终结果
-                if status in ["有效", "部分有效"]:
-                    self.progress_updated.emit(i + 1, f"✓ {session_name} - {user_info}")
-                    valid_sessions.append({
-                        'session_file': str(session_file),
-                        'session_name': session_name
-                    })
+                # 检查是否已连接和授权；用户信息不在扫描时获取，需要时从右键菜单查询
+                if await client.is_user_authorized():
+                    user_info = "已授权"
+                    status = "有效"
                 else:
-                    self.progress_updated.emit(i + 1, f"✗ {session_name} - {user_info}")
+                    user_info = "未授权"
+                    status = "未授权"
 
+            except asyncio.TimeoutError:
+                user_info = "连接超时"
+                status = "无效"
             except Exception as e:
-                self.progress_updated.emit(i + 1, f"错误: {session_name} - {str(e)[:50]}...")
-                continue
+                user_info = f"验证失败: {str(e)[:30]}..."
+                status = "无效"
+            finally:
+                kept = client is not None and status == "有效"
+                if kept:
+                    # 保持连接，导入时直接复用，省去再次握手；断开时Telethon还会写入session文件，断开后再记录缓存
+                    await scan_clients.keep(
+                        str(session_file.resolve()), client,
+                        partial(_record_scan_result, str(session_file), status, user_info)
+                    )
+                elif client is not None:
+                    try:
+                        await client.disconnect()
+                    except Exception:
+                        pass
+
+            if status in _CACHEABLE_STATUS and not kept:
+                # 连接时Telethon会写入session文件，以验证后的状态作为缓存键
+                st = os.stat(session_file)
+                self._cache[str(session_file)] = [st.st_size, st.st_mtime_ns, status, user_info]
+                self._cache_dirty = True
+
+            return self._finish_one(i, session_file, session_name, status, user_info)
 
-        return valid_sessions
+        except Exception as e:
+            self._report(i + 1, "error", session_name, f"{str(e)[:50]}...")
+
+        return None
+
+
+def _scan_client(session_file, api_id=None, api_hash=None):
+    """创建用于验证session文件的客户端：只尝试一次，失效的session尽快失败"""
+    return TelegramClient(
+        session=str(session_file),
+        api_id=api_id if api_id is not None else config.telegram.api_id,
+        api_hash=api_hash if api_hash is not None else config.telegram.api_hash,
+        connection_retries=1,
+        retry_delay=0,
+        request_retries=1,
+        timeout=5,
+        auto_reconnect=False
+    )
+
+
+def _is_sqlite(path):
+    """只读取文件头判断是否为SQLite文件，不打开数据库"""
+    try:
+        with open(path, "rb") as f:
+            return f.read(len(_SQLITE_MAGIC)) == _SQLITE_MAGIC
+    except OSError:
+        return False
+
+
+def _load_scan_cache():
+    """读取扫描结果缓存，文件不存在或损坏时返回空字典"""
+    try:
+        with open(_SCAN_CACHE_PATH, encoding="utf-8") as f:
+            cache = json.load(f)
+        return cache if isinstance(cache, dict) else {}
+    except (OSError, ValueError):
+        return {}
+
+
+def _record_scan_result(path, status, user_info):
+    """扫描保留的客户端断开后记录缓存项，同一轮事件循环内的多次记录合并为一次写入"""
+    try:
+        st = os.stat(path)
+    except OSError:
+        return
+    if not _pending_scan_results:
+        asyncio.get_running_loop().call_soon(_flush_scan_results)
+    _pending_scan_results[path] = [st.st_size, st.st_mtime_ns, status, user_info]
+
+
+def _flush_scan_results():
+    """把待记录的缓存项合并到缓存文件"""
+    cache = _load_scan_cache()
+    cache.update(_pending_scan_results)
+    _pending_scan_results.clear()
+    _save_scan_cache(cache)
+
+
+def _save_scan_cache(cache):
+    """写入临时文件后替换，避免写入中断时损坏缓存"""
+    tmp_path = _SCAN_CACHE_PATH.with_suffix(".tmp")
+    try:
+        _SCAN_CACHE_PATH.parent.mkdir(parents=True, exist_ok=True)
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(cache, f, ensure_ascii=False)
+        os.replace(tmp_path, _SCAN_CACHE_PATH)
+    except OSError as e:
+        logger.warning(f"保存session扫描缓存失败: {e}")
 
 
 class BulkAddDialog(QDialog):
@@ -884,6 +1195,7 @@ class BulkAddDialog(QDialog):
         self.resize(600, 500)
         self.found_sessions = []
         self.selected_files = []
+        self._items = []  # 与 selected_files 一一对应的列表项
         self.scan_worker = None
         self.setup_ui()
 
@@ -918,12 +1230,19 @@ class BulkAddDialog(QDialog):
         # session文件列表
         self.session_list = QListWidget()
         self.session_list.setMaximumHeight(200)
+        self.session_list.setContextMenuPolicy(Qt.ContextMenuPolicy.CustomContextMenu)
+        self.session_list.customContextMenuRequested.connect(self._show_session_menu)
         layout.addWidget(self.session_list)
 
         # 进度条
         self.progress_label = QLabel("")
         layout.addWidget(self.progress_label)
 
+        # 扫描期间定期刷新进度，界面更新频率与扫描速度无关
+        self._drain_timer = QTimer(self)
+        self._drain_timer.setInterval(33)
+        self._drain_timer.timeout.connect(self._drain_updates)
+
         self.progress_bar = QProgressBar()
         self.progress_bar.setVisible(False)
         layout.addWidget(self.progress_bar)
@@ -936,6 +1255,14 @@ class BulkAddDialog(QDialog):
         cancel_btn.clicked.connect(self.reject)
         buttons_layout.addWidget(cancel_btn)
 
+        # 并发数：超过16后受MTProto数据中心的连接频率限制，提升很小
+        buttons_layout.addWidget(QLabel("并发数"))
+        self.concurrency_spin = QSpinBox()
+        self.concurrency_spin.setRange(1, 32)
+        self.concurrency_spin.setValue(8)
+        self.concurrency_spin.setToolTip("同时验证的session数量，超过16提升不明显")
+        buttons_layout.addWidget(self.concurrency_spin)
+
         scan_btn = QPushButton("扫描Session")
         scan_btn.clicked.connect(self.scan_sessions)
         buttons_layout.addWidget(scan_btn)
@@ -951,6 +1278,8 @@ class BulkAddDialog(QDialog):
 
     def _on_scan_completed(self, valid_sessions):
         """扫描完成回调"""
+        self._drain_timer.stop()
+        self._drain_updates(force=True)
         self.found_sessions = valid_sessions
 
         self.progress_bar.setVisible(False)
@@ -963,18 +1292,83 @@ class BulkAddDialog(QDialog):
             self.result_label.setText("没有找到有效的session文件")
             self.import_btn.setEnabled(False)
 
-    def _on_progress_updated(self, index, message):
-        """进度更新处理"""
-        self.progress_bar.setValue(index)
+    def _drain_updates(self, force=False):
+        """取走扫描任务积累的进度消息，统一更新界面（最多约30次/秒）"""
+        worker = self.scan_worker
+        if worker is None:
+            return
+        self.progress_bar.setValue(worker.done)
+        updates = worker.updates
+        # 对话框不可见（如最小化）时先保留消息，重新显示或扫描结束时再生成文字
+        if not updates or not (force or self.isVisible()):
+            return
+
+        # 每行只需显示最新的一条消息
+        latest = {}
+        while updates:
+            update = updates.popleft()
+            latest[update[0]] = update
+
+        # 更新列表项状态，全部设置完后统一重绘一次
+        self.session_list.setUpdatesEnabled(False)
+        try:
+            items = self._items
+            count = len(items)
+            for index, code, session_name, detail in latest.values():
+                if 0 < index <= count:
+                    items[index - 1].setText(_SCAN_MESSAGES[code].format(session_name, detail))
+        finally:
+            self.session_list.setUpdatesEnabled(True)
 
-        # 更新列表项状态
-        if index <= self.session_list.count():
-            item = self.session_list.item(index - 1)
-            if item:
-                item.setText(message)
+    def _show_session_menu(self, pos):
+        """Session列表右键菜单"""
+        item = self.session_list.itemAt(pos)
+        if item is None:
+            return
+        menu = QMenu(self)
+        details_action = menu.addAction("查询详情")
+        if menu.exec(self.session_list.viewport().mapToGlobal(pos)) is details_action:
+            asyncio.ensure_future(self._fetch_details(item))
+
+    async def _fetch_details(self, item):
+        """按需获取单个session的用户信息"""
+        info = item.data(Qt.ItemDataRole.UserRole)
+        session_name = info['session_name']
+        item.setText(f"{session_name} - 查询中...")
+
+        # 扫描时保持连接的客户端直接使用，避免同一session文件再打开一个连接
+        kept = scan_clients.get(str(Path(info['session_file']).resolve()))
+        client = None
+        try:
+            if kept is None:
+                client = _scan_client(info['session_file'])
+                await asyncio.wait_for(client.connect(), _SCAN_TIMEOUT)
+            if kept is not None or await client.is_user_authorized():
+                me = await asyncio.wait_for((kept or client).get_me(), _SCAN_TIMEOUT)
+                text = f"✓ {session_name} - {me.first_name or '未知'} ({me.phone or '无手机号'})"
+            else:
+                text = f"✗ {session_name} - 未授权"
+        except asyncio.TimeoutError:
+            text = f"✗ {session_name} - 连接超时"
+        except Exception as e:
+            text = f"✗ {session_name} - 查询失败: {str(e)[:30]}..."
+        finally:
+            if client is not None:
+                try:
+                    await client.disconnect()
+                except Exception:
+                    pass
+
+        try:
+            item.setText(text)
+        except RuntimeError:
+            # 查询期间重新选择了文件，列表项已被删除
+            pass
 
     def _on_scan_error(self, error_msg):
         """扫描错误处理"""
+        self._drain_timer.stop()
+        self._drain_updates(force=True)
         self.progress_bar.setVisible(False)
         self.progress_label.setText("")
         QMessageBox.critical(self, "错误", f"验证过程中出现错误: {error_msg}")
@@ -999,21 +1393,39 @@ class BulkAddDialog(QDialog):
                 self, "选择Session文件", "", "Session文件 (*.session);;所有文件 (*)"
             )
         if file_paths:
+            # 按真实路径去重，同一文件（如符号链接）只验证一次
+            seen = set()
+            unique_paths = []
+            for file_path in file_paths:
+                resolved = str(Path(file_path).resolve())
+                if resolved not in seen:
+                    seen.add(resolved)
+                    unique_paths.append(file_path)
+            file_paths = unique_paths
+
             # 显示选择的文件数量
             self.folder_input.setText(f"已选择 {len(file_paths)} 个文件")
             self.selected_files = file_paths
             self.result_label.setText("点击'扫描Session'开始验证")
             self.session_list.clear()
+            self._items = []
 
-            # 直接显示选择的文件
-            for file_path in file_paths:
-                file_name = Path(file_path).stem
-                item = QListWidgetItem(f"{file_name} - 待验证")
-                item.setData(Qt.ItemDataRole.UserRole, {
-                    'session_file': file_path,
-                    'session_name': file_name
-                })
-                self.session_list.addItem(item)
+            # 直接显示选择的文件：添加期间暂停重绘和信号，全部添加完后统一刷新一次
+            self.session_list.setUpdatesEnabled(False)
+            self.session_list.blockSignals(True)
+            try:
+                for file_path in file_paths:
+                    file_name = Path(file_path).stem
+                    item = QListWidgetItem(f"{file_name} - 待验证")
+                    item.setData(Qt.ItemDataRole.UserRole, {
+                        'session_file': file_path,
+                        'session_name': file_name
+                    })
+                    self.session_list.addItem(item)
+                    self._items.append(item)
+            finally:
+                self.session_list.blockSignals(False)
+                self.session_list.setUpdatesEnabled(True)
 
     def scan_sessions(self):
         """验证选中的session文件"""
@@ -1027,14 +1439,32 @@ class BulkAddDialog(QDialog):
         self.progress_label.setText(f"正在验证 {len(self.selected_files)} 个session文件...")
         self.found_sessions = []
 
-        # 创建并启动工作线程
-        self.scan_worker = SessionScanWorker(self.selected_files)
-        self.scan_worker.progress_updated.connect(self._on_progress_updated)
+        # 创建并启动扫描任务，上一次未完成的扫描先取消
+        if self.scan_worker is not None:
+            self.scan_worker.cancel()
+        self.scan_worker = SessionScanWorker(self.selected_files, self.concurrency_spin.value(), self)
         self.scan_worker.scan_completed.connect(self._on_scan_completed)
         self.scan_worker.error_occurred.connect(self._on_scan_error)
 
         self.scan_worker.start()
-
+        self._drain_timer.start()
+
+
+    def accept(self):
+        """确认导入时停止仍在进行的扫描，避免导入取走缓存的客户端后又被重新填入"""
+        if self.scan_worker is not None:
+            self.scan_worker.cancel()
+            self._drain_timer.stop()
+        super().accept()
+
+    def reject(self):
+        """取消导入时停止扫描并断开扫描保留的连接"""
+        if self.scan_worker is not None:
+            self.scan_worker.cancel()
+            self._drain_timer.stop()
+        if scan_clients:
+            asyncio.ensure_future(disconnect_scan_clients())
+        super().reject()
 
     def get_accounts(self):
         """返回要添加的账号列表"""
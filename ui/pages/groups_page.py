@@ -5,12 +5,18 @@ from PyQt6.QtCore import Qt, QThread, pyqtSignal
 from PyQt6.QtGui import QColor
 import asyncio
 import re
+from qasync import asyncSlot
 from telethon.tl.functions.channels import JoinChannelRequest
 from telethon.tl.functions.messages import ImportChatInviteRequest  # 新增引用
 from telethon.errors import UserAlreadyParticipantError, InviteHashExpiredError  # 新增引用
 from core.database import db_manager
 from core.telegram_client import telegram_client
 
+# 邀请链接 Hash 的合法字符
+_HASH_RE = re.compile(r'^[a-zA-Z0-9_-]+$')
+# 加入成功的账号每累计这么多个写入一次数据库
+_JOIN_FLUSH_SIZE = 5
+
 
 class GroupsPage(QWidget):
     """群组管理页面"""
@@ -20,8 +26,8 @@ class GroupsPage(QWidget):
         self.current_group = None
         self.groups_data = {}
         self.setup_ui()
-        from PyQt6.QtCore import QTimer
-        QTimer.singleShot(200, self.load_groups_from_db)
+        # 页面在 qasync 事件循环中创建，直接调度加载任务
+        self.load_groups_from_db()
 
     def setup_ui(self):
         layout = QVBoxLayout(self)
@@ -105,62 +111,46 @@ class GroupsPage(QWidget):
         self.progress_bar.setVisible(False)
         layout.addWidget(self.progress_bar)
 
-    def load_groups_from_db(self):
-        """加载群组 (使用 asyncio)"""
-        async def _load():
-            try:
-                groups = await db_manager.get_managed_groups()
-                self.groups_data = {}
-                self.groups_combo.clear()
-                self.groups_combo.addItem("请选择群组...")
-
-                for group in groups:
-                    # 根据加入状态显示不同的信息
-                    status_indicator = ""
-                    if group.get('join_status') == 'pending':
-                        status_indicator = "[待加入] "
-                    elif group.get('join_status') == 'joined':
-                        status_indicator = "[已加入] "
-
-                    # 为恢复的群组提供更好的显示名称
-                    title = group['title']
-                    if title.startswith('群组 ') and group.get('chat_id'):
-                        # 如果是恢复的群组，尝试提供更好的名称
-                        chat_id = group['chat_id']
-                        if group.get('username'):
-                            title = f"@{group['username']}"
+    @asyncSlot()
+    async def load_groups_from_db(self):
+        """加载群组 (在 qasync 事件循环中运行)"""
+        try:
+            groups = await db_manager.get_managed_groups()
+            self.groups_data = {}
+            self.groups_combo.clear()
+            self.groups_combo.addItem("请选择群组...")
+
+            for group in groups:
+                # 根据加入状态显示不同的信息
+                status_indicator = ""
+                if group.get('join_status') == 'pending':
+                    status_indicator = "[待加入] "
+                elif group.get('join_status') == 'joined':
+                    status_indicator = "[已加入] "
+
+                # 为恢复的群组提供更好的显示名称
+                title = group['title']
+                if title.startswith('群组 ') and group.get('chat_id'):
+                    # 如果是恢复的群组，尝试提供更好的名称
+                    chat_id = group['chat_id']
+                    if group.get('username'):
+                        title = f"@{group['username']}"
+                    else:
+                        # 尝试从chat_id推断类型
+                        if str(chat_id).startswith('-100'):
+                            title = f"频道 {chat_id}"
+                        elif str(chat_id).startswith('-'):
+                            title = f"群组 {chat_id}"
                         else:
-                            # 尝试从chat_id推断类型
-                            if str(chat_id).startswith('-100'):
-                                title = f"频道 {chat_id}"
-                            elif str(chat_id).startswith('-'):
-                                title = f"群组 {chat_id}"
-                            else:
-                                title = f"对话 {chat_id}"
+                            title = f"对话 {chat_id}"
 
-                    link_info = group.get('username') or group.get('original_link') or '无链接'
-                    display = f"{status_indicator}{title} ({link_info})"
-                    self.groups_data[display] = group
-                    self.groups_combo.addItem(display)
+                link_info = group.get('username') or group.get('original_link') or '无链接'
+                display = f"{status_indicator}{title} ({link_info})"
+                self.groups_data[display] = group
+                self.groups_combo.addItem(display)
 
-            except Exception as e:
-                print(f"Error loading groups: {e}")
-
-        # 安全地创建任务，避免在应用程序关闭时出现未等待的协程警告
-        try:
-            loop = asyncio.get_running_loop()
-            task = loop.create_task(_load())
-            # 添加任务完成回调来处理可能的异常
-            task.add_done_callback(lambda t: t.exception() if t.exception() else None)
-        except RuntimeError:
-            # 如果没有运行中的事件循环，直接运行（用于初始化时）
-            import asyncio as asyncio_module
-            loop = asyncio_module.new_event_loop()
-            asyncio_module.set_event_loop(loop)
-            try:
-                loop.run_until_complete(_load())
-            finally:
-                loop.close()
+        except Exception as e:
+            print(f"Error loading groups: {e}")
 
     def on_group_selected_by_combo(self, text):
         if text not in self.groups_data:
@@ -191,28 +181,28 @@ class GroupsPage(QWidget):
             self.accounts_list.clear()
             group_id = self.current_group['chat_id']
             try:
-                session_names = await db_manager.get_group_sessions(group_id)
-                all_sessions = await db_manager.get_all_sessions()
-                session_map = {s['session_name']: s for s in all_sessions}
-
-                for session_name in session_names:
-                    session_data = session_map.get(session_name)
-                    if session_data:
-                        display_name = session_data.get('user_name', session_name)
-                        phone = session_data.get('phone_number', '未知')
-                        item_text = f"{display_name} ({phone})"
-                        item = QListWidgetItem(item_text)
-                        item.setData(Qt.ItemDataRole.UserRole, session_data)
-                        self.accounts_list.addItem(item)
+                # 一次查询取回本群组关联账号的完整信息
+                for session_data in await db_manager.get_group_sessions_with_details(group_id):
+                    display_name = session_data.get('user_name', session_data['session_name'])
+                    phone = session_data.get('phone_number', '未知')
+                    item_text = f"{display_name} ({phone})"
+                    item = QListWidgetItem(item_text)
+                    item.setData(Qt.ItemDataRole.UserRole, session_data)
+                    self.accounts_list.addItem(item)
 
             except Exception as e:
                 print(f"Error loading group accounts: {e}")
 
         asyncio.create_task(_load_accts())
 
+    def _accounts_data(self):
+        """账号管理页中已加载的账号列表"""
+        page_accounts = getattr(self.window(), 'page_accounts', None)
+        return page_accounts.accounts_data if page_accounts is not None else []
+
     def add_group(self):
         """添加新群组"""
-        dialog = AddGroupDialog(self)
+        dialog = AddGroupDialog(self, self._accounts_data())
         if dialog.exec() == QDialog.DialogCode.Accepted:
             group_data = dialog.get_group_data()
             if group_data:
@@ -306,7 +296,7 @@ class GroupsPage(QWidget):
             QMessageBox.warning(self, "警告", "请先选择一个群组")
             return
 
-        dialog = AccountSelectionDialog(self, self.current_group)
+        dialog = AccountSelectionDialog(self, self.current_group, self._accounts_data())
         if dialog.exec() == QDialog.DialogCode.Accepted:
             selected_sessions = dialog.get_selected_sessions()
             if selected_sessions:
@@ -347,132 +337,176 @@ class GroupsPage(QWidget):
             original_link = self.current_group.get('original_link')
             username = self.current_group.get('username')
 
-            success_count = 0
-
-            for i, session_name in enumerate(session_names):
-                try:
-                    # 1. 检查数据库
-                    existing = await db_manager.get_group_sessions(group_id)
-                    if session_name in existing:
-                        success_count += 1
-                        print(f"账号 {session_name} 已在群组中 (DB check)，跳过")
-                        continue
-
-                    # 2. 启动会话
-                    if not await telegram_client.start_session(session_name):
-                        print(f"启动会话失败: {session_name}")
-                        continue
-
-                    client = telegram_client.clients.get(session_name)
-                    if not client:
-                        print(f"获取客户端失败: {session_name}")
-                        continue
-
-                    join_success = False
-
-                    # === 增强的加入逻辑 ===
+            # 由原始链接派生的备用形式对所有账号相同，只计算一次
+            constructed_url = None
+            invite_hash = None
+            if original_link:
+                # 纯字符串链接可构造为 t.me URL 再次尝试
+                if 't.me' not in original_link and 'http' not in original_link:
+                    constructed_url = f"https://t.me/{original_link.strip().strip('@')}"
+                clean_hash = original_link.split('/')[-1].replace('+', '').strip()
+                if clean_hash and _HASH_RE.match(clean_hash):
+                    invite_hash = clean_hash
+
+            # 群组现有成员只查询一次，加入成功后在本地集合中追加
+            existing = set(await db_manager.get_group_sessions(group_id))
+            # 加入成功、尚未写入数据库的账号，按小批次写入
+            joined_names = []
+            group_info_updated = False
+            # 各账号互不依赖，并发加入，同时最多 5 个
+            semaphore = asyncio.Semaphore(5)
+
+            async def _join_one(session_name):
+                """让单个账号加入群组，返回是否成功"""
+                nonlocal group_info_updated
+                async with semaphore:
                     try:
-                        # 策略 A: 优先使用原始链接 (最准确)
-                        if original_link and not join_success:
-                            print(f"尝试通过原始链接加入 ({session_name}): {original_link}")
-                            try:
-                                await client.join_channel(original_link)
-                                join_success = True
-                                print(f"✅ 通过原始链接加入成功")
-                            except Exception as e:
-                                print(f"原始链接加入失败: {e}")
-                                # 如果是纯字符串且失败了，尝试构造 URL 再次尝试
-                                if 't.me' not in original_link and 'http' not in original_link:
-                                    constructed_url = f"https://t.me/{original_link.strip().strip('@')}"
-                                    print(f"尝试通过构造URL加入: {constructed_url}")
-                                    try:
-                                        await client.join_channel(constructed_url)
-                                        join_success = True
-                                        print(f"✅ 通过构造URL加入成功")
-                                    except Exception as e2:
-                                        print(f"构造URL加入失败: {e2}")
-
-                                # 如果还是失败，且看起来像 Hash，尝试 ImportChatInviteRequest
-                                if not join_success:
-                                    clean_hash = original_link.split('/')[-1].replace('+', '').strip()
-                                    if clean_hash and re.match(r'^[a-zA-Z0-9_-]+$', clean_hash):
-                                        print(f"尝试作为邀请Hash加入: {clean_hash}")
+                        # 1. 检查数据库
+                        if session_name in existing:
+                            print(f"账号 {session_name} 已在群组中 (DB check)，跳过")
+                            return True
+
+                        # 2. 启动会话
+                        if not await telegram_client.start_session(session_name):
+                            print(f"启动会话失败: {session_name}")
+                            return False
+
+                        client = telegram_client.clients.get(session_name)
+                        if not client:
+                            print(f"获取客户端失败: {session_name}")
+                            return False
+
+                        join_success = False
+
+                        # === 增强的加入逻辑 ===
+                        try:
+                            # 策略 A: 优先使用原始链接 (最准确)
+                            if original_link and not join_success:
+                                print(f"尝试通过原始链接加入 ({session_name}): {original_link}")
+                                try:
+                                    await client.join_channel(original_link)
+                                    join_success = True
+                                    print(f"✅ 通过原始链接加入成功")
+                                except Exception as e:
+                                    print(f"原始链接加入失败: {e}")
+                                    # 如果是纯字符串且失败了，尝试构造 URL 再次尝试
+                                    if constructed_url:
+                                        print(f"尝试通过构造URL加入: {constructed_url}")
                                         try:
-                                            await client(ImportChatInviteRequest(clean_hash))
+                                            await client.join_channel(constructed_url)
+                                            join_success = True
+                                            print(f"✅ 通过构造URL加入成功")
+                                        except Exception as e2:
+                                            print(f"构造URL加入失败: {e2}")
+
+                                    # 如果还是失败，且看起来像 Hash，尝试 ImportChatInviteRequest
+                                    if not join_success and invite_hash:
+                                        print(f"尝试作为邀请Hash加入: {invite_hash}")
+                                        try:
+                                            await client(ImportChatInviteRequest(invite_hash))
                                             join_success = True
                                             print(f"✅ 通过邀请Hash加入成功")
                                         except Exception as e3:
                                             print(f"邀请Hash加入失败: {e3}")
 
-                        # 策略 B: 使用用户名 (如果跟原始链接不同)
-                        if not join_success and username and username != original_link:
-                            print(f"尝试通过用户名加入 ({session_name}): {username}")
-                            try:
-                                await client(JoinChannelRequest(username))
-                                join_success = True
-                                print(f"✅ 通过用户名加入成功")
-                            except Exception as e:
-                                print(f"用户名加入失败: {e}")
-
-                        # 策略 C: 通过 ID (仅对已知群组有效)
-                        if not join_success and group_id:
-                            print(f"尝试通过ID加入 ({session_name}): {group_id}")
-                            try:
-                                entity = await client.get_entity(group_id)
-                                await client(JoinChannelRequest(entity))
+                            # 策略 B: 使用用户名 (如果跟原始链接不同)
+                            if not join_success and username and username != original_link:
+                                print(f"尝试通过用户名加入 ({session_name}): {username}")
+                                try:
+                                    await client(JoinChannelRequest(username))
+                                    join_success = True
+                                    print(f"✅ 通过用户名加入成功")
+                                except Exception as e:
+                                    print(f"用户名加入失败: {e}")
+
+                            # 策略 C: 通过 ID (仅对已知群组有效)
+                            if not join_success and group_id:
+                                print(f"尝试通过ID加入 ({session_name}): {group_id}")
+                                try:
+                                    entity = await client.get_entity(group_id)
+                                    await client(JoinChannelRequest(entity))
+                                    join_success = True
+                                    print(f"✅ 通过ID加入成功")
+                                except Exception as e:
+                                    print(f"ID加入失败: {e}")
+
+                        except UserAlreadyParticipantError:
+                            print(f"账号已在群组中 (Telegram API): {session_name}")
+                            join_success = True
+                        except InviteHashExpiredError:
+                             print(f"邀请链接已过期 ({session_name})")
+                        except Exception as e:
+                            # 兜底捕获
+                            error_str = str(e).lower()
+                            if "already" in error_str:
                                 join_success = True
-                                print(f"✅ 通过ID加入成功")
-                            except Exception as e:
-                                print(f"ID加入失败: {e}")
-
-                    except UserAlreadyParticipantError:
-                        print(f"账号已在群组中 (Telegram API): {session_name}")
-                        join_success = True
-                    except InviteHashExpiredError:
-                         print(f"邀请链接已过期 ({session_name})")
+                                print(f"账号已在群组中 (Generic Error): {session_name}")
+                            else:
+                                print(f"加入尝试全失败 ({session_name}): {e}")
+
+                        if join_success:
+                            joined_names.append(session_name)
+                            existing.add(session_name)
+
+                            # 更新群组信息（只由第一个成功的账号执行）
+                            if not group_info_updated:
+                                group_info_updated = True
+                                try:
+                                    # 尝试获取最新的群组实体信息
+                                    entity_ref = username or original_link or group_id
+                                    if entity_ref:
+                                        try:
+                                            chat = await client.get_entity(entity_ref)
+                                            await db_manager.update_managed_group_chat_id(
+                                                self.current_group['title'],
+                                                chat.id,
+                                                getattr(chat, 'title', None),
+                                                getattr(chat, 'username', None)
+                                            )
+                                            print(f"已更新群组信息: {chat.title} ID:{chat.id}")
+                                        except:
+                                            pass
+                                except:
+                                    pass
+
+                        return join_success
+
                     except Exception as e:
-                        # 兜底捕获
-                        error_str = str(e).lower()
-                        if "already" in error_str:
-                            join_success = True
-                            print(f"账号已在群组中 (Generic Error): {session_name}")
-                        else:
-                            print(f"加入尝试全失败 ({session_name}): {e}")
+                        print(f"处理账号异常 ({session_name}): {e}")
+                        return False
+
+            async def _flush_joined():
+                """把已加入的账号写入数据库"""
+                nonlocal joined_names
+                if not joined_names:
+                    return
+                names, joined_names = joined_names, []
+                if not await db_manager.add_group_sessions(group_id, names):
+                    print(f"保存群组成员失败 ({len(names)} 个账号): {names}")
 
-                    if join_success:
-                        await db_manager.add_group_session(group_id, session_name)
+            success_count = 0
+            done = 0
+            tasks = [asyncio.create_task(_join_one(name)) for name in session_names]
+            try:
+                for future in asyncio.as_completed(tasks):
+                    if await future:
                         success_count += 1
+                    done += 1
+                    if len(joined_names) >= _JOIN_FLUSH_SIZE:
+                        await _flush_joined()
 
-                        # 更新群组信息
-                        if success_count == 1:
-                            try:
-                                # 尝试获取最新的群组实体信息
-                                entity_ref = username or original_link or group_id
-                                if entity_ref:
-                                    try:
-                                        chat = await client.get_entity(entity_ref)
-                                        await db_manager.update_managed_group_chat_id(
-                                            self.current_group['title'],
-                                            chat.id,
-                                            getattr(chat, 'title', None),
-                                            getattr(chat, 'username', None)
-                                        )
-                                        print(f"已更新群组信息: {chat.title} ID:{chat.id}")
-                                    except:
-                                        pass
-                            except:
-                                pass
-
-                except Exception as e:
-                    print(f"处理账号异常 ({session_name}): {e}")
-
-                # 安全地更新进度条，避免对象已被删除的错误
-                try:
-                    if hasattr(self, 'progress_bar') and self.progress_bar and not self.progress_bar.isHidden():
-                        self.progress_bar.setValue(i + 1)
-                except (RuntimeError, AttributeError):
-                    # 进度条对象已被删除，跳过更新
-                    pass
+                    # 安全地更新进度条，避免对象已被删除的错误
+                    try:
+                        if hasattr(self, 'progress_bar') and self.progress_bar and not self.progress_bar.isHidden():
+                            self.progress_bar.setValue(done)
+                    except (RuntimeError, AttributeError):
+                        # 进度条对象已被删除，跳过更新
+                        pass
+            finally:
+                # 被取消（如关闭窗口）时停止其余加入，已成功的账号仍然写入数据库
+                for task in tasks:
+                    task.cancel()
+                await _flush_joined()
 
             # 安全地隐藏进度条
             try:
@@ -503,10 +537,11 @@ class GroupsPage(QWidget):
 class AddGroupDialog(QDialog):
     """添加群组对话框 (简化版：直接输入链接)"""
 
-    def __init__(self, parent=None):
+    def __init__(self, parent=None, accounts_data=None):
         super().__init__(parent)
         self.setWindowTitle("添加群组")
         self.resize(500, 400)
+        self.accounts_data = accounts_data or []
         self.fetched_group_data = None
         self.fetch_worker = None
         self.setup_ui()
@@ -557,7 +592,7 @@ class AddGroupDialog(QDialog):
         self.status_label.setStyleSheet("color: #007AFF; font-size: 12px;")
 
         # 使用工作线程处理异步操作，避免与PyQt事件循环冲突
-        self.fetch_worker = GroupFetchWorker(link)
+        self.fetch_worker = GroupFetchWorker(link, self.accounts_data)
         self.fetch_worker.fetch_completed.connect(self._on_fetch_completed)
         self.fetch_worker.fetch_error.connect(self._on_fetch_error)
         self.fetch_worker.start()
@@ -600,13 +635,7 @@ class AddGroupDialog(QDialog):
             self.add_btn.setText("获取信息并添加")
 
     async def _auto_select_account(self):
-        from PyQt6.QtWidgets import QApplication
-        for widget in QApplication.topLevelWidgets():
-            if hasattr(widget, 'page_accounts'):
-                accounts = widget.page_accounts.accounts_data
-                if accounts:
-                    return accounts[0]
-        return None
+        return self.accounts_data[0] if self.accounts_data else None
 
     def parse_group_link(self, link):
         link = link.strip()
@@ -645,9 +674,10 @@ class AddGroupDialog(QDialog):
 
 
 class AccountSelectionDialog(QDialog):
-    def __init__(self, parent=None, group_data=None):
+    def __init__(self, parent=None, group_data=None, accounts_data=None):
         super().__init__(parent)
         self.group_data = group_data
+        self.accounts_data = accounts_data or []
         self.setWindowTitle(f"选择账号加入: {group_data['title']}")
         self.resize(400, 400)
         layout = QVBoxLayout(self)
@@ -690,24 +720,20 @@ class AccountSelectionDialog(QDialog):
 
     def populate_account_list(self):
         """填充账号列表"""
-        from PyQt6.QtWidgets import QApplication
-        for widget in QApplication.topLevelWidgets():
-            if hasattr(widget, 'page_accounts'):
-                for account in widget.page_accounts.accounts_data:
-                    session_name = account['session_name']
-                    item = QListWidgetItem(f"{account['name']} ({account['phone']})")
-                    item.setData(Qt.ItemDataRole.UserRole, account)
-
-                    # 如果账号已经在群组中，默认勾选且禁用
-                    if session_name in self.existing_sessions:
-                        item.setCheckState(Qt.CheckState.Checked)
-                        item.setFlags(item.flags() & ~Qt.ItemFlag.ItemIsEnabled)  # 禁用该项
-                        item.setText(f"✓ {account['name']} ({account['phone']}) [已加入]")
-                    else:
-                        item.setCheckState(Qt.CheckState.Unchecked)
+        for account in self.accounts_data:
+            session_name = account.session_name
+            item = QListWidgetItem(account.display)
+            item.setData(Qt.ItemDataRole.UserRole, account)
+
+            # 如果账号已经在群组中，默认勾选且禁用
+            if session_name in self.existing_sessions:
+                item.setCheckState(Qt.CheckState.Checked)
+                item.setFlags(item.flags() & ~Qt.ItemFlag.ItemIsEnabled)  # 禁用该项
+                item.setText(f"✓ {account.display} [已加入]")
+            else:
+                item.setCheckState(Qt.CheckState.Unchecked)
 
-                    self.list_widget.addItem(item)
-                break
+            self.list_widget.addItem(item)
 
     def get_selected_sessions(self):
         """获取新选择的账号（排除已加入的账号）"""
@@ -716,7 +742,7 @@ class AccountSelectionDialog(QDialog):
             item = self.list_widget.item(i)
             if item.checkState() == Qt.CheckState.Checked:
                 data = item.data(Qt.ItemDataRole.UserRole)
-                session_name = data['session_name']
+                session_name = data.session_name
                 # 只返回新选择的账号，已加入的不需要再次处理
                 if session_name not in self.existing_sessions:
                     sessions.append(session_name)
@@ -728,9 +754,10 @@ class GroupFetchWorker(QThread):
     fetch_completed = pyqtSignal(dict)
     fetch_error = pyqtSignal(str)
 
-    def __init__(self, link):
+    def __init__(self, link, accounts_data=None):
         super().__init__()
         self.link = link
+        self.accounts_data = accounts_data or []
 
     def run(self):
         """在工作线程中执行异步操作"""
@@ -764,14 +791,14 @@ class GroupFetchWorker(QThread):
         print(f"DEBUG: selected_account = {selected_account}")  # 调试信息
 
         # 检查selected_account是否有session_name
-        if 'session_name' not in selected_account:
+        if not selected_account.session_name:
             raise ValueError(f"账号数据不完整，缺少session_name字段: {selected_account}")
 
         # 直接创建并启动一个新的client，避免与主程序的session冲突
         from core.session_manager import session_manager
         from config import config
 
-        session_name = selected_account['session_name']
+        session_name = selected_account.session_name
         print(f"DEBUG: session_name = {session_name}")  # 调试信息
 
         # 从数据库获取session数据
@@ -861,15 +888,12 @@ class GroupFetchWorker(QThread):
 
     async def _auto_select_account(self):
         """自动选择一个可用的账号"""
-        from PyQt6.QtWidgets import QApplication
-        for widget in QApplication.topLevelWidgets():
-            if hasattr(widget, 'page_accounts'):
-                accounts = widget.page_accounts.accounts_data
-                print(f"DEBUG: Found {len(accounts)} accounts")  # 调试信息
-                if accounts:
-                    print(f"DEBUG: First account = {accounts[0]}")  # 调试信息
-                    return accounts[0]
-        print("DEBUG: No accounts page found or no accounts")  # 调试信息
+        accounts = self.accounts_data
+        print(f"DEBUG: Found {len(accounts)} accounts")  # 调试信息
+        if accounts:
+            print(f"DEBUG: First account = {accounts[0]}")  # 调试信息
+            return accounts[0]
+        print("DEBUG: No accounts found")  # 调试信息
         return None
 
     def parse_group_link(self, link):
@@ -362,8 +362,7 @@ class ScriptTab(QWidget):
                     # 注意：不能在当前 Loop await 旧 client.disconnect()，因为它属于别的 Loop
                     # 但 Telethon 的 disconnect 比较宽容，通常可以直接丢弃引用
                     # 从管理器移除
-                    if session_name in telegram_client.clients:
-                        del telegram_client.clients[session_name]
+                    telegram_client.forget_client(session_name)
                     # 强制重新启动
                     client = None
 
@@ -1060,13 +1059,16 @@ class ScriptPage(QWidget):
         new_tab.min_interval_spinbox.setValue(current_tab.min_interval_spinbox.value())
         new_tab.max_interval_spinbox.setValue(current_tab.max_interval_spinbox.value())
 
-    def stop_all_executions(self):
-        """停止所有标签页的执行"""
+    def stop_script_execution(self):
+        """静默停止所有标签页的执行（如关闭窗口时）"""
         for i in range(self.tab_widget.count()):
             tab = self.tab_widget.widget(i)
             if hasattr(tab, 'stop_script_execution'):
                 tab.stop_script_execution()
 
+    def stop_all_executions(self):
+        """停止所有标签页的执行"""
+        self.stop_script_execution()
         QMessageBox.information(self, "完成", "已停止所有剧本执行")
 
     def get_current_tab(self):
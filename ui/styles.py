@@ -1,5 +1,8 @@
 # ui/styles.py
 
+from functools import lru_cache
+
+@lru_cache(maxsize=1)
 def get_stylesheet():
     return """
     QMainWindow {